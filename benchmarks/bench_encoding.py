@@ -0,0 +1,60 @@
+"""Per-reading envelope encoding: generic path vs precompiled schema encoder.
+
+The generic path is what WearableDataProcessor does for unregistered sensor
+types: json.dumps for the metadata size check plus ensure_json_compact.
+
+    python benchmarks/bench_encoding.py --readings 200000
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from wearables_sdk.schema import SensorSchema
+from wearables_sdk.security import ensure_json_compact
+
+CASES = {
+    "heart_rate": (SensorSchema("heart_rate", int, {"unit": str}), 72, {"unit": "bpm"}),
+    "worker_vitals": (
+        SensorSchema("worker_vitals", {"heart_rate": int, "body_temperature": float},
+                     {"worker_id": str, "site_id": str, "session_id": str,
+                      "alert_threshold_hr": int, "alert_threshold_temp": float}),
+        {"heart_rate": 96, "body_temperature": 37.2},
+        {"worker_id": "W-001", "site_id": "SITE-A", "session_id": "safety_W-001_1760851232",
+         "alert_threshold_hr": 120, "alert_threshold_temp": 38.0},
+    ),
+}
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    p.add_argument("--readings", type=int, default=200000)
+    n = p.parse_args().readings
+    ts = datetime.utcnow().isoformat()
+    millis = 1760851232123
+
+    print(f"{'sensor_type':<14} {'generic us':>10} {'schema us':>10} {'speedup':>8}")
+    for name, (schema, value, metadata) in CASES.items():
+        encoder = schema.compile()
+
+        def generic():
+            if len(json.dumps(metadata)) > 1024:
+                raise ValueError
+            return ensure_json_compact({"id": f"{name}_{millis}", "sensor_type": name, "value": value,
+                                        "timestamp_request": ts, "metadata": metadata})
+
+        def compiled():
+            return encoder.encode(millis, ts, value, metadata, 1024)
+
+        assert generic() == compiled()
+        g = timeit.timeit(generic, number=n) / n * 1e6
+        c = timeit.timeit(compiled, number=n) / n * 1e6
+        print(f"{name:<14} {g:>10.2f} {c:>10.2f} {g / c:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
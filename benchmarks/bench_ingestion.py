@@ -0,0 +1,79 @@
+"""Multi-producer ingestion: direct queue puts vs per-thread staging buffers.
+
+Each producer thread submits a fixed number of readings (backing off when the
+queue is full) against an in-process transport that answers instantly, so the
+numbers reflect hashing, queue hand-off and commit costs rather than the
+network. "end-to-end/s" counts readings committed to the processed store.
+
+    python benchmarks/bench_ingestion.py --threads 1 4 16 --readings 20000
+"""
+import argparse
+import logging
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from wearables_sdk.core import IntegritasClient, WearableDataProcessor
+from wearables_sdk.transport import Transport, TransportResponse
+
+_OK = TransportResponse(200, "OK", {}, b'{"timestamp":"2026-01-01T00:00:00Z","hash":"x","proof":"p"}')
+
+
+class NullTransport(Transport):
+    def request(self, method, path, body=None, headers=None, timeout=(5, 10)):
+        return _OK
+
+    post_timestamp = lambda self, data_hash, timeout=(5, 10): _OK
+
+
+def run(threads, per_thread, staging):
+    client = IntegritasClient("bench", transport=NullTransport)
+    dropped = []
+    processor = WearableDataProcessor(client, staging_batch_size=staging, on_queue_overflow=dropped.append)
+    processor.start_background_processing()
+    retries = [0] * threads
+
+    def produce(n):
+        for _ in range(per_thread):
+            while True:
+                try:
+                    processor.add_sensor_reading("heart_rate", 72, {"unit": "bpm"})
+                    break
+                except RuntimeError:  # queue full: back off and retry, as a real producer would
+                    retries[n] += 1
+                    time.sleep(0.0005)
+
+    workers = [threading.Thread(target=produce, args=(n,)) for n in range(threads)]
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    produced = time.perf_counter() - start
+    left = processor.stop_background_processing(drain_timeout=60.0)
+    elapsed = time.perf_counter() - start
+    committed = len(processor.get_processed_data())
+    return committed / elapsed, threads * per_thread / produced, sum(retries), len(dropped), left
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    p.add_argument("--threads", type=int, nargs="+", default=[1, 4, 16])
+    p.add_argument("--readings", type=int, default=20000, help="readings per producer thread")
+    p.add_argument("--batch", type=int, default=64, help="staging batch size")
+    args = p.parse_args()
+    logging.getLogger("wearables_sdk").setLevel(logging.CRITICAL)
+
+    print(f"{'mode':<8} {'threads':>7} {'end-to-end/s':>13} {'produce/s':>10} {'backoffs':>9} "
+          f"{'dropped':>8} {'left':>5}")
+    for threads in args.threads:
+        for mode, staging in (("direct", None), ("staged", args.batch)):
+            rate, produce_rate, backoffs, dropped, left = run(threads, args.readings, staging)
+            print(f"{mode:<8} {threads:>7} {rate:>13.0f} {produce_rate:>10.0f} {backoffs:>9} "
+                  f"{dropped:>8} {left:>5}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Compare IntegritasClient transports against the local mock server.
+
+Reports wall-clock throughput, client-thread CPU time per request (server
+threads excluded) and bytes allocated per request (tracemalloc, separate pass).
+
+    python benchmarks/bench_transport.py --requests 2000
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from wearables_sdk.core import IntegritasClient, sha3_256
+from wearables_sdk.mock_server import MockIntegritasServer
+from wearables_sdk.transport import TRANSPORTS
+
+
+def _run(client, hashes):
+    for h in hashes:
+        if not client.timestamp_data(h).success:
+            raise RuntimeError("timestamp failed during benchmark")
+
+
+def bench(transport, base_url, n):
+    client = IntegritasClient("bench", base_url=base_url, transport=transport)
+    hashes = [sha3_256(str(i).encode()).hexdigest() for i in range(n)]
+    try:
+        _run(client, hashes[:50])  # warm up connections
+        wall, cpu = time.perf_counter(), time.thread_time()
+        _run(client, hashes)
+        wall, cpu = time.perf_counter() - wall, time.thread_time() - cpu
+
+        tracemalloc.start()
+        _run(client, hashes[:200])
+        _, peak = tracemalloc.get_traced_memory()
+        snapshot_total = sum(s.size for s in tracemalloc.take_snapshot().statistics("filename"))
+        tracemalloc.stop()
+    finally:
+        client.close()
+    return {
+        "req_per_s": n / wall,
+        "cpu_us_per_req": cpu / n * 1e6,
+        "peak_kib": peak / 1024.0,
+        "retained_kib": snapshot_total / 1024.0,
+    }
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    p.add_argument("--requests", type=int, default=2000)
+    p.add_argument("--transports", nargs="+", default=sorted(TRANSPORTS), choices=sorted(TRANSPORTS))
+    args = p.parse_args()
+    logging.getLogger("wearables_sdk").setLevel(logging.CRITICAL)
+
+    with MockIntegritasServer() as server:
+        print(f"{'transport':<12} {'req/s':>9} {'cpu us/req':>11} {'peak KiB':>9} {'retained KiB':>13}")
+        for name in args.transports:
+            r = bench(name, server.base_url, args.requests)
+            print(f"{name:<12} {r['req_per_s']:>9.0f} {r['cpu_us_per_req']:>11.1f} "
+                  f"{r['peak_kib']:>9.1f} {r['retained_kib']:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
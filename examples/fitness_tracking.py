@@ -14,6 +14,10 @@ class FitnessTracker:
         self.steps = 0
         self.distance = 0.0
         self.calories = 0.0
+        # Rolling per-session stats, updated as each record is timestamped
+        self.sdk.register_aggregate("workout_steps", sensor_type="steps", group_by="session_id")
+        self.sdk.register_aggregate("workout_hr", sensor_type="heart_rate_zone", group_by="session_id",
+                                    ewma_alpha=0.3)
         
     def start_workout(self, workout_type: str):
         """Start a new workout session"""
@@ -82,10 +86,21 @@ class FitnessTracker:
         print(f"Ended workout. Total: {self.steps} steps, {self.distance:.2f} km")
     
     def get_workout_summary(self):
-        """Get verified workout summary"""
+        """Get verified workout records"""
         verified = self.sdk.get_verified_data()
-        workout_data = [r for r in verified if r['original_data'].get('session_id') == self.session_id]
+        workout_data = [r for r in verified if r['original_data']['metadata'].get('session_id') == self.session_id]
         return workout_data
+
+    def get_workout_stats(self):
+        """Verified workout totals, without rescanning the records"""
+        steps = self.sdk.get_aggregate("workout_steps", self.session_id) or {}
+        hr = self.sdk.get_aggregate("workout_hr", self.session_id) or {}
+        return {
+            "steps": steps.get("max"),
+            "avg_hr": hr.get("mean"),
+            "peak_hr": hr.get("max"),
+            "recent_hr": hr.get("ewma")
+        }
     
     def shutdown(self):
         self.sdk.shutdown()
@@ -118,6 +133,7 @@ def main():
         # Get verified summary
         summary = tracker.get_workout_summary()
         print(f"\nVerified workout records: {len(summary)}")
+        print(f"Verified stats: {tracker.get_workout_stats()}")
         for record in summary:
             original = record['original_data']
             print(f"  {original['sensor_type']}: {original.get('value', 'N/A')}")
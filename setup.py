@@ -31,6 +31,11 @@ setup(
     install_requires=[
         "requests>=2.31.0",
     ],
+    entry_points={
+        "console_scripts": [
+            "wearables-loadtest=wearables_sdk.loadtest:main",
+        ],
+    },
     extras_require={
         "dev": ["pytest>=6.0", "black", "flake8"],
         "legacy": ["pysha3>=1.0.2"],  # For Python < 3.6
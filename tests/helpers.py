@@ -0,0 +1,19 @@
+"""Stubs shared by the test modules"""
+from wearables_sdk.core import IntegritasClient, WearableDataProcessor
+from wearables_sdk.transport import Transport, TransportResponse
+
+
+class InstantTransport(Transport):
+    """Answers every request at once with a successful timestamp"""
+
+    def request(self, method, path, body=None, headers=None, timeout=(5, 10)):
+        return TransportResponse(200, "OK", {}, b'{"timestamp":"t","hash":"h","proof":"p"}')
+
+
+def start_processor(test, **kwargs):
+    """A running WearableDataProcessor on InstantTransport, stopped when test finishes"""
+    client = IntegritasClient("dummy", transport=InstantTransport)
+    processor = WearableDataProcessor(client, **kwargs)
+    processor.start_background_processing()
+    test.addCleanup(processor.stop_background_processing)
+    return processor
@@ -0,0 +1,81 @@
+import logging, random, time, unittest
+from wearables_sdk.aggregates import Aggregate
+from helpers import start_processor
+
+logging.getLogger("wearables_sdk").setLevel(logging.CRITICAL)
+
+class _Clock:
+    now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def _record(sensor_type, value, **metadata):
+    return {"original_data": {"sensor_type": sensor_type, "value": value, "metadata": metadata}}
+
+class TestAggregates(unittest.TestCase):
+    def test_all_time_grouped_with_ewma(self):
+        agg = Aggregate("hr", sensor_type="heart_rate", group_by="worker", ewma_alpha=0.5)
+        agg.update([_record("heart_rate", 60, worker="a"), _record("heart_rate", 80, worker="a"),
+                    _record("heart_rate", 100, worker="b"), _record("steps", 5, worker="a"),
+                    _record("heart_rate", "n/a", worker="a"), _record("heart_rate", True, worker="a")])
+        self.assertEqual(agg.get("a"), {"count": 2, "sum": 140, "min": 60, "max": 80, "mean": 70, "ewma": 70})
+        self.assertEqual(agg.get("b")["count"], 1)
+        self.assertIsNone(agg.get("c"))
+        self.assertEqual(set(agg.groups()), {"a", "b"})
+
+    def test_metadata_field(self):
+        agg = Aggregate("temp", field="temp")
+        agg.update([_record("env", None, temp=20.5), _record("env", None, temp=21.5), _record("env", None)])
+        self.assertEqual(agg.get()["mean"], 21.0)
+
+    def test_tumbling_window(self):
+        clock = _Clock()
+        agg = Aggregate("steps", window=60, wall_clock=clock)
+        agg.update([_record("steps", 10), _record("steps", 20)])
+        self.assertEqual(agg.get()["sum"], 30)
+        clock.now += 60
+        self.assertEqual(agg.get()["count"], 0)
+        agg.update([_record("steps", 5)])
+        self.assertEqual(agg.get()["sum"], 5)
+        self.assertEqual(agg.get()["window_start"], 1020.0)
+        clock.now -= 120  # wall clock stepped back: keep the current window
+        self.assertEqual(agg.get()["window_start"], 1020.0)
+
+    def test_tumbling_window_start_is_wall_clock(self):
+        agg = Aggregate("steps", window=60)
+        before = time.time()
+        agg.update([_record("steps", 1)])
+        start = agg.get()["window_start"]
+        self.assertEqual(start % 60, 0)
+        self.assertTrue(before - 60 < start <= before)
+
+    def test_sliding_window_matches_rescan(self):
+        clock = _Clock()
+        agg = Aggregate("hr", window=10, sliding=True, clock=clock)
+        rng = random.Random(7)
+        history = []
+        for _ in range(2000):
+            clock.now += rng.random()
+            v = rng.randint(40, 200)
+            history.append((clock.now, v))
+            agg.update([_record("hr", v)])
+            window = [x for t, x in history if t > clock.now - 10]
+            got = agg.get()
+            self.assertEqual((got["count"], got["min"], got["max"]), (len(window), min(window), max(window)))
+            self.assertAlmostEqual(got["sum"], sum(window), places=6)
+        clock.now += 11
+        self.assertEqual(agg.get(), {"count": 0, "sum": 0.0, "min": None, "max": None, "mean": None})
+
+    def test_updated_on_commit(self):
+        processor = start_processor(self)
+        processor.register_aggregate("steps", sensor_type="steps", group_by="session_id")
+        for i in range(1, 6):
+            processor.add_sensor_reading("steps", i * 100, {"session_id": "s1"})
+        processor.add_sensor_reading("heart_rate", 120, {"session_id": "s1"})
+        self.assertEqual(processor.drain(5.0), 0)
+        self.assertEqual(processor.get_aggregate("steps", "s1")["max"], 500)
+        self.assertEqual(processor.get_aggregate("steps", "s1")["count"], 5)
+
+if __name__ == "__main__":
+    unittest.main()
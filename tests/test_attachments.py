@@ -0,0 +1,98 @@
+import array, logging, os, shutil, tempfile, unittest
+from wearables_sdk.attachments import AttachmentStore, describe_attachment
+from wearables_sdk.core import WearablesSDK, sha3_256
+from wearables_sdk.mock_server import MockIntegritasServer
+from wearables_sdk.schema import SensorSchema
+from wearables_sdk.security import ensure_json_compact
+
+logging.getLogger("wearables_sdk").setLevel(logging.CRITICAL)
+
+class TestAttachments(unittest.TestCase):
+    def test_descriptor_hashes_typed_buffers_in_place(self):
+        samples = array.array("h", range(1000))
+        view, descriptor = describe_attachment(memoryview(samples))
+        self.assertEqual(descriptor["length"], 2000)
+        self.assertEqual(descriptor["sha3_256"], sha3_256(samples.tobytes()).hexdigest())
+        self.assertIs(view.obj, samples)
+        with self.assertRaises(TypeError):
+            describe_attachment("not bytes")
+
+    def test_store_keeps_bytes_by_reference_and_copies_mutable_buffers(self):
+        store = AttachmentStore()
+        data = b"x" * 100
+        view, d = describe_attachment(data)
+        store.put(view, d["sha3_256"])
+        self.assertIs(store.get(d["sha3_256"]), data)
+
+        buf = bytearray(b"abc")
+        view, d = describe_attachment(buf)
+        store.put(view, d["sha3_256"])
+        buf[0] = ord("z")
+        self.assertEqual(store.get(d["sha3_256"]), b"abc")
+
+    def test_spill_and_release(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        store = AttachmentStore(spill_dir=tmp, spill_threshold=1024)
+        big, small = os.urandom(4096), b"small"
+        for data in (big, big, small):
+            view, d = describe_attachment(data)
+            store.put(view, d["sha3_256"])
+        big_digest = describe_attachment(big)[1]["sha3_256"]
+        self.assertEqual(store.stats()["spilled"], 1)
+        self.assertEqual(store.stats()["memory_bytes"], len(small))
+        self.assertEqual(store.get(big_digest), big)
+        store.discard(big_digest)
+        self.assertEqual(store.get(big_digest), big)  # still referenced once
+        store.discard(big_digest)
+        self.assertIsNone(store.get(big_digest))
+        self.assertEqual(os.listdir(tmp), [])
+
+    def test_discard_during_spill_write_leaves_no_file(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        store = AttachmentStore(spill_dir=tmp, spill_threshold=0)
+        view, d = describe_attachment(b"frame")
+        write = store._write
+        def racing_write(digest, v):
+            store.discard(digest)  # e.g. the reading was refused while its bytes were being written
+            write(digest, v)
+        store._write = racing_write
+        store.put(view, d["sha3_256"])
+        self.assertEqual(os.listdir(tmp), [])
+        self.assertIsNone(store.get(d["sha3_256"]))
+
+        store._write = write
+        store.put(view, d["sha3_256"])
+        os.remove(os.path.join(tmp, d["sha3_256"] + ".bin"))  # removed by a concurrent discard
+        self.assertIsNone(store.get(d["sha3_256"]))
+
+    def test_schema_encoder_matches_generic_envelope(self):
+        _, attachment = describe_attachment(b"\x00\x01\x02")
+        encoder = SensorSchema("ppg", int, {"rate": int}).compile()
+        envelope = {"id": "ppg_1", "sensor_type": "ppg", "value": 5, "timestamp_request": "2024-01-01T00:00:00",
+                    "metadata": {"rate": 64}, "attachment": attachment}
+        self.assertEqual(encoder.encode(1, "2024-01-01T00:00:00", 5, {"rate": 64}, attachment=attachment),
+                         ensure_json_compact(envelope))
+
+    def test_record_verify_and_fetch(self):
+        frame = bytes(range(256)) * 64
+        with MockIntegritasServer() as server:
+            sdk = WearablesSDK("dummy", base_url=server.base_url)
+            try:
+                sdk.register_sensor_type("ppg", int, {"rate": int})
+                sdk.record_sensor_data("ppg", 1, {"rate": 64}, attachment=memoryview(frame))
+                sdk.record_sensor_data("audio", None, attachment=bytearray(b"\x7f" * 10))
+                self.assertEqual(sdk.data_processor.drain(5.0), 0)
+                records = sdk.get_verified_data()
+                self.assertTrue(all(sdk.verify_timestamp(r) for r in records))
+                ppg = next(r for r in records if r["original_data"]["sensor_type"] == "ppg")
+                self.assertEqual(ppg["original_data"]["attachment"]["length"], len(frame))
+                self.assertEqual(sdk.get_attachment(ppg), frame)
+                tampered = dict(ppg, original_data=dict(ppg["original_data"], attachment={"length": 1, "sha3_256": "0"}))
+                self.assertFalse(sdk.verify_timestamp(tampered))
+            finally:
+                sdk.shutdown()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,9 @@
-import unittest, json, time
+import unittest, json, time, logging, threading
 from wearables_sdk.core import WearablesSDK, sha3_256
+from wearables_sdk.mock_server import MockIntegritasServer
+from helpers import start_processor
+
+logging.getLogger("wearables_sdk").setLevel(logging.CRITICAL)
 
 class TestCore(unittest.TestCase):
     def test_metadata_limit(self):
@@ -10,5 +14,97 @@ class TestCore(unittest.TestCase):
         finally:
             sdk.shutdown()
 
+    def test_registered_sensor_type_hashes_identically(self):
+        with MockIntegritasServer() as server:
+            sdk = WearablesSDK("dummy", base_url=server.base_url)
+            try:
+                sdk.register_sensor_type("heart_rate", int, {"unit": str})
+                sdk.record_sensor_data("heart_rate", 72, {"unit": "bpm"})
+                sdk.record_sensor_data("heart_rate", 73, {"unit": "bpm", "note": "unregistered shape"})
+                with self.assertRaises(ValueError):
+                    sdk.record_sensor_data("heart_rate", 74, {"unit": "x" * 2000})
+                self.assertEqual(sdk.data_processor.drain(5.0), 0)
+                records = sdk.get_verified_data()
+                self.assertEqual(len(records), 2)
+                self.assertTrue(all(sdk.verify_timestamp(r) for r in records))
+            finally:
+                sdk.shutdown()
+
+class TestWorkerLifecycle(unittest.TestCase):
+    def test_idle_exit_and_restart(self):
+        with MockIntegritasServer() as server:
+            sdk = WearablesSDK("dummy", base_url=server.base_url, idle_timeout=0.1)
+            try:
+                sdk.record_sensor_data("heart_rate", 70)
+                self.assertEqual(sdk.data_processor.drain(5.0), 0)
+                deadline = time.monotonic() + 5.0
+                while sdk.get_status()["worker_running"] and time.monotonic() < deadline:
+                    time.sleep(0.02)
+                self.assertFalse(sdk.get_status()["worker_running"])
+
+                sdk.record_sensor_data("heart_rate", 71)
+                self.assertEqual(sdk.data_processor.drain(5.0), 0)
+                self.assertEqual(len(sdk.get_verified_data()), 2)
+            finally:
+                sdk.shutdown()
+
+    def test_drain_with_deadline_reports_pending(self):
+        with MockIntegritasServer(latency=0.2) as server:
+            sdk = WearablesSDK("dummy", base_url=server.base_url)
+            for i in range(5):
+                sdk.record_sensor_data("steps", i)
+            left = sdk.shutdown(drain_timeout=0.1)
+            self.assertGreater(left, 0)
+            self.assertLessEqual(left, 5)
+
+        with MockIntegritasServer() as server:
+            sdk = WearablesSDK("dummy", base_url=server.base_url)
+            for i in range(5):
+                sdk.record_sensor_data("steps", i)
+            self.assertEqual(sdk.shutdown(drain_timeout=5.0), 0)
+            self.assertEqual(len(sdk.get_verified_data()), 5)
+
+    def test_restart_after_stop(self):
+        with MockIntegritasServer(latency=0.1) as server:
+            sdk = WearablesSDK("dummy", base_url=server.base_url)
+            processor = sdk.data_processor
+            try:
+                sdk.record_sensor_data("steps", 1)
+                time.sleep(0.05)  # worker is mid-request, so the stop marker stays queued
+                processor.stop_background_processing(timeout=0.5)
+                started = time.monotonic()
+                processor.drain(5.0)
+                self.assertLess(time.monotonic() - started, 1.0)
+
+                processor.start_background_processing()
+                sdk.record_sensor_data("steps", 2)
+                self.assertEqual(processor.drain(5.0), 0)
+                self.assertEqual(len(sdk.get_verified_data()), 2)
+            finally:
+                sdk.shutdown()
+
+class TestStagedIngestion(unittest.TestCase):
+    def test_many_producers(self):
+        processor = start_processor(self, staging_batch_size=16)
+        def produce():
+            for i in range(200):
+                processor.add_sensor_reading("steps", i)
+        threads = [threading.Thread(target=produce) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(processor.drain(5.0), 0)
+        self.assertEqual(len(processor.get_processed_data()), 1600)
+
+    def test_partial_batch_is_not_stranded(self):
+        processor = start_processor(self, staging_batch_size=64, staging_max_delay=0.05)
+        processor.add_sensor_reading("steps", 1)
+        self.assertEqual(processor.get_pending_count() + len(processor.get_processed_data()), 1)
+        deadline = time.monotonic() + 5.0
+        while not processor.get_processed_data() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(len(processor.get_processed_data()), 1)
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,98 @@
+import unittest, logging
+from wearables_sdk.core import WearablesSDK, IntegritasClient, WearableDataProcessor
+from wearables_sdk.limiter import AdaptiveConcurrencyLimiter, parse_retry_after
+from wearables_sdk.mock_server import MockIntegritasServer
+
+logging.getLogger("wearables_sdk").setLevel(logging.CRITICAL)
+
+class TestAdaptiveConcurrencyLimiter(unittest.TestCase):
+    def setUp(self):
+        self.now = [0.0]
+        self.limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=8, clock=lambda: self.now[0])
+
+    def _fill(self):
+        while self.limiter.acquire(timeout=0):
+            pass
+
+    def test_additive_increase_when_saturated(self):
+        for _ in range(20):
+            self._fill()
+            for _ in range(self.limiter.snapshot()["in_flight"]):
+                self.limiter.release(0.05, 200)
+        self.assertGreater(self.limiter.limit, 2)
+        self.assertLessEqual(self.limiter.limit, 8)
+
+    def test_multiplicative_decrease_once_per_round_trip(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=8, max_limit=8, clock=lambda: self.now[0])
+        while limiter.acquire(timeout=0):
+            pass
+        for _ in range(8):
+            limiter.release(0.1, 429)
+        self.assertEqual(limiter.limit, 4)
+        self.now[0] = 1.0
+        limiter.acquire(timeout=0)
+        limiter.release(0.1, 503)
+        self.assertEqual(limiter.limit, 2)
+
+    def test_retry_after_blocks_dispatch(self):
+        self.limiter.acquire(timeout=0)
+        self.limiter.release(0.1, 429, retry_after=5.0)
+        self.assertFalse(self.limiter.acquire(timeout=0))
+        self.now[0] = 5.0
+        self.assertTrue(self.limiter.acquire(timeout=0))
+
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after("3"), 3.0)
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after("soon"))
+        self.assertEqual(parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"), 0.0)
+        self.assertIsNone(parse_retry_after("inf"))
+        self.assertIsNone(parse_retry_after("nan"))
+        self.assertEqual(parse_retry_after("1e12"), 300.0)
+        self.assertEqual(parse_retry_after("90", max_seconds=30), 30)
+
+    def test_default_initial_limit_fits_bounds(self):
+        self.assertEqual(AdaptiveConcurrencyLimiter(max_limit=1).limit, 1)
+        self.assertEqual(AdaptiveConcurrencyLimiter(min_limit=4, max_limit=8).limit, 4)
+        self.assertEqual(AdaptiveConcurrencyLimiter().limit, 2)
+        with self.assertRaises(ValueError):
+            AdaptiveConcurrencyLimiter(initial_limit=3, max_limit=2)
+
+    def test_retry_after_is_capped(self):
+        limiter = AdaptiveConcurrencyLimiter(max_retry_after=10.0, clock=lambda: self.now[0])
+        limiter.acquire(timeout=0)
+        limiter.release(0.1, 429, retry_after=1e9)
+        self.now[0] = 10.0
+        self.assertTrue(limiter.acquire(timeout=0))
+
+class _BrokenClient(IntegritasClient):
+    def timestamp_data(self, data_hash):
+        raise KeyError("unexpected")
+
+class TestLimitedProcessing(unittest.TestCase):
+    def test_throttled_requests_are_retried(self):
+        with MockIntegritasServer(latency=0.02, max_concurrency=2) as server:
+            limiter = AdaptiveConcurrencyLimiter(initial_limit=4, max_limit=8)
+            sdk = WearablesSDK("dummy", base_url=server.base_url, limiter=limiter)
+            for i in range(30):
+                sdk.record_sensor_data("steps", i)
+            self.assertEqual(sdk.shutdown(drain_timeout=10.0), 0)
+            self.assertEqual(len(sdk.get_verified_data()), 30)
+            self.assertGreater(limiter.snapshot()["throttled"], 0)
+            self.assertIn("concurrency", sdk.get_status())
+
+    def test_slot_released_when_request_raises(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=2)
+        processor = WearableDataProcessor(_BrokenClient("dummy"), limiter=limiter)
+        processor.start_background_processing()
+        try:
+            for i in range(5):
+                processor.add_sensor_reading("steps", i)
+            self.assertEqual(processor.drain(5.0), 0)
+            self.assertEqual(limiter.snapshot()["in_flight"], 0)
+            self.assertEqual(limiter.snapshot()["failed"], 5)
+        finally:
+            processor.stop_background_processing()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest, json, logging, io, contextlib
+import requests
+from wearables_sdk.mock_server import MockIntegritasServer
+from wearables_sdk.loadtest import run_load_test, synthetic_trace, main
+
+logging.getLogger("wearables_sdk").setLevel(logging.CRITICAL)
+
+class TestMockServer(unittest.TestCase):
+    def test_timestamp_and_throttle(self):
+        with MockIntegritasServer(rate_limit=1, burst=1, retry_after=3) as server:
+            url = f"{server.base_url}/v1/timestamp"
+            headers = {"Authorization": "Bearer test"}
+            ok = requests.post(url, json={"hash": "ab" * 32}, headers=headers, timeout=5)
+            self.assertEqual(ok.status_code, 200)
+            self.assertEqual(ok.json()["hash"], "ab" * 32)
+            self.assertTrue(ok.json()["proof"])
+            throttled = requests.post(url, json={"hash": "ab" * 32}, headers=headers, timeout=5)
+            self.assertEqual(throttled.status_code, 429)
+            self.assertEqual(throttled.headers["Retry-After"], "3")
+            self.assertEqual(server.stats()["throttled"], 1)
+
+    def test_injected_errors(self):
+        with MockIntegritasServer(error_rate=1.0) as server:
+            r = requests.post(f"{server.base_url}/v1/timestamp", json={"hash": "00"},
+                              headers={"Authorization": "Bearer test"}, timeout=5)
+            self.assertEqual(r.status_code, 500)
+
+class TestLoadHarness(unittest.TestCase):
+    def test_synthetic_trace_shape(self):
+        events = list(synthetic_trace("safety", duration=1.0, rate=30, seed=1))
+        self.assertEqual(len(events), 30)
+        self.assertEqual(events[0]["sensor_type"], "worker_vitals")
+        self.assertEqual(events, list(synthetic_trace("safety", duration=1.0, rate=30, seed=1)))
+        with self.assertRaises(ValueError):
+            list(synthetic_trace("nope"))
+
+    def test_replay_against_mock(self):
+        with MockIntegritasServer() as server:
+            events = synthetic_trace("mixed", duration=0.5, rate=40, seed=7)
+            report = run_load_test(events, server.base_url, speed=5.0, settle=5.0)
+        self.assertEqual(report["submitted"], 20)
+        self.assertEqual(report["timestamped"], 20)
+        self.assertEqual(report["dropped"], 0)
+        self.assertIsNotNone(report["latency_ms"]["p99"])
+        self.assertGreater(report["throughput_per_s"], 0)
+
+    def test_main_runs_mock_in_subprocess(self):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            main(["--profile", "fitness", "--duration", "0.5", "--rate", "20", "--speed", "5",
+                  "--latency", "0", "--json"])
+        report = json.loads(out.getvalue())
+        self.assertEqual(report["timestamped"], 10)
+        self.assertEqual(report["server"]["ok"], 10)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest, logging, threading, time
+from wearables_sdk.logging_utils import EventLog, enable_async_logging, disable_async_logging
+
+class _Capture(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+        self.threads = []
+    def emit(self, record):
+        self.records.append(record.getMessage())
+        self.threads.append(threading.current_thread().name)
+
+def _logger(name):
+    log = logging.getLogger(name)
+    log.propagate = False
+    log.setLevel(logging.INFO)
+    cap = _Capture()
+    log.handlers = [cap]
+    return log, cap
+
+class TestEventLog(unittest.TestCase):
+    def test_sampling(self):
+        log, cap = _logger("test.events.sampling")
+        events = EventLog(log, sample_every={"timestamped": 10, "failed": 0})
+        for i in range(25):
+            events.event("timestamped", logging.INFO, "Timestamped: %s", i)
+        events.event("failed", logging.ERROR, "Failed %s", "x")
+        self.assertEqual(cap.records, ["Timestamped: 0", "Timestamped: 10", "Timestamped: 20"])
+        self.assertEqual(events.counts(), {"timestamped": 25, "failed": 1})
+
+    def test_rate_limited_summary(self):
+        log, cap = _logger("test.events.summary")
+        now = [0.0]
+        events = EventLog(log, sample_every={"timestamped": 0}, summary_interval=10.0, clock=lambda: now[0])
+        for _ in range(5):
+            events.event("timestamped", logging.INFO, "Timestamped: %s", "id")
+        self.assertEqual(cap.records, [])
+        now[0] = 10.0
+        events.event("timestamped", logging.INFO, "Timestamped: %s", "id")
+        self.assertEqual(cap.records, ["6 readings timestamped in last 10s"])
+        events.flush()
+        self.assertEqual(len(cap.records), 1)
+
+    def test_concurrent_callers_emit_one_summary(self):
+        log, cap = _logger("test.events.concurrent")
+        now = [0.0]
+        def clock():
+            time.sleep(0.0005)  # widen the gap between deciding a summary is due and starting a new window
+            return now[0]
+        events = EventLog(log, sample_every={"timestamped": 0}, summary_interval=10.0, clock=clock)
+        events.event("timestamped", logging.INFO, "Timestamped: %s", "id")
+        now[0] = 10.0
+        start = threading.Barrier(8)
+        def burst():
+            start.wait()
+            for _ in range(20):
+                events.event("timestamped", logging.INFO, "Timestamped: %s", "id")
+        threads = [threading.Thread(target=burst) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(cap.records), 1)
+        self.assertTrue(cap.records[0].endswith("in last 10s"), cap.records)
+
+    def test_no_summary_without_interval(self):
+        log, cap = _logger("test.events.nosummary")
+        events = EventLog(log, sample_every={"timestamped": 0})
+        events.event("timestamped", logging.INFO, "Timestamped: %s", "id")
+        events.flush()
+        self.assertEqual(cap.records, [])
+
+class TestAsyncLogging(unittest.TestCase):
+    def test_records_handled_off_thread(self):
+        log, cap = _logger("test.events.async")
+        enable_async_logging(log)
+        try:
+            log.info("hello %s", "world")
+        finally:
+            disable_async_logging(log)
+        self.assertEqual(cap.records, ["hello world"])
+        self.assertNotEqual(cap.threads[0], threading.current_thread().name)
+        self.assertEqual(log.handlers, [cap])
+
+if __name__ == "__main__":
+    unittest.main()
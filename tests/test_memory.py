@@ -0,0 +1,117 @@
+import gc, logging, os, shutil, tempfile, unittest
+from wearables_sdk.attachments import AttachmentStore
+from wearables_sdk.core import IntegritasClient, WearableDataProcessor, WearablesSDK
+from wearables_sdk.memory import OWNER_FILE, SpillableStore, estimate_size
+from helpers import InstantTransport, start_processor
+
+logging.getLogger("wearables_sdk").setLevel(logging.CRITICAL)
+
+class TestSpillableStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+
+    def test_spilled_records_read_back_like_a_list(self):
+        records = [{"id": f"r{i}", "value": i, "metadata": {"k": [i, None]}} for i in range(2500)]
+        store = SpillableStore(self.tmp, "s", segment_records=1000)
+        store.extend(records)
+        self.assertEqual(store.hot_bytes, sum(estimate_size(r) for r in records))
+        store.spill(0)
+        self.assertEqual((store.spilled, store.hot_bytes), (2500, 0))
+        store.extend([{"id": "hot"}])
+        self.assertEqual(len(store), 2501)
+        self.assertEqual(store[0], records[0])
+        self.assertEqual(store[1999], records[1999])
+        self.assertEqual(store[-1], {"id": "hot"})
+        self.assertEqual(store[990:1010], records[990:1010])
+        self.assertEqual(store[2490:], records[2490:] + [{"id": "hot"}])
+        self.assertEqual(store[::1000], records[::1000])
+        everything = records + [{"id": "hot"}]
+        self.assertEqual(store[::-1], everything[::-1])
+        self.assertEqual(store[2100:900:-7], everything[2100:900:-7])
+        self.assertEqual(store[5:0:-1], everything[5:0:-1])
+        self.assertEqual(store[0:5:-1], [])
+        self.assertEqual(len(store._cache), 2)
+        with self.assertRaises(IndexError):
+            store[2501]
+
+        segments = os.path.join(self.tmp, "records-s")
+        self.assertEqual(sorted(os.listdir(segments))[:3], [f"{i:08d}.jsonl.gz" for i in range(3)])
+        del store
+        gc.collect()
+        self.assertFalse(os.path.exists(segments))
+
+    def test_iter_pages_reads_one_segment_at_a_time(self):
+        records = [{"id": i} for i in range(2500)]
+        store = SpillableStore(self.tmp, "s", segment_records=1000, cached_segments=1)
+        store.extend(records)
+        store.spill(0)
+        store.extend([{"id": "hot"}])
+        pages = list(store.iter_pages(500))
+        self.assertEqual([len(p) for p in pages], [500, 1000, 500, 1])
+        self.assertEqual([r for p in pages for r in p], (records + [{"id": "hot"}])[500:])
+        self.assertEqual(len(store._cache), 1)
+        self.assertEqual(list(store), records + [{"id": "hot"}])
+
+    def test_sweeps_directories_of_dead_processes(self):
+        stale = os.path.join(self.tmp, "records-crashed")
+        os.makedirs(stale)
+        with open(os.path.join(stale, OWNER_FILE), "w") as f:
+            f.write("999999999")  # no such process
+        live = os.path.join(self.tmp, "records-live")
+        os.makedirs(live)
+        with open(os.path.join(live, OWNER_FILE), "w") as f:
+            f.write(str(os.getpid()))
+        os.makedirs(os.path.join(self.tmp, "unrelated"))
+        SpillableStore(self.tmp, "s")
+        self.assertEqual(sorted(os.listdir(self.tmp)), ["records-live", "unrelated"])
+
+    def test_without_spill_dir_everything_stays_in_memory(self):
+        store = SpillableStore()
+        store.extend([{"id": 1}])
+        self.assertEqual(store.spill(0), 0)
+        self.assertEqual(store.copy(), [{"id": 1}])
+
+class TestMemoryGovernor(unittest.TestCase):
+    def test_spills_verified_records_to_stay_within_budget(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        sdk = WearablesSDK("dummy", transport=InstantTransport, memory_budget=300_000, spill_dir=tmp)
+        self.addCleanup(sdk.shutdown)
+        processor = sdk.data_processor
+        for i in range(3000):
+            sdk.record_sensor_data("steps", i, {"session_id": "s1"})
+            if i % 50 == 49:
+                self.assertEqual(processor.drain(5.0), 0)
+        self.assertEqual(processor.drain(5.0), 0)
+        usage = sdk.get_status()["memory"]
+        self.assertLessEqual(usage["total"], 300_000)
+        self.assertGreater(usage["spilled_records"], 0)
+        self.assertEqual(usage["refusals"], 0)
+        self.assertEqual([r["original_data"]["value"] for r in processor.get_processed_since(0, 3)], [0, 1, 2])
+        records = sdk.get_verified_data()
+        self.assertEqual([r["original_data"]["value"] for r in records], list(range(3000)))
+        self.assertTrue(sdk.verify_timestamp(records[0]))
+        self.assertEqual([r["original_data"]["value"] for r in sdk.iter_verified_data(2990)], list(range(2990, 3000)))
+
+    def test_budget_requires_spill_dir(self):
+        with self.assertRaises(ValueError):
+            WearableDataProcessor(IntegritasClient("dummy", transport=InstantTransport), memory_budget=20_000)
+
+    def test_refuses_readings_when_nothing_can_be_spilled(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        dropped = []
+        # attachments kept in memory by a store that cannot spill
+        processor = start_processor(self, memory_budget=20_000, spill_dir=tmp, attachment_store=AttachmentStore(),
+                                    on_queue_overflow=dropped.append)
+        with self.assertRaises(RuntimeError):
+            for i in range(1000):
+                processor.add_sensor_reading("steps", i, attachment=os.urandom(2000))
+                self.assertEqual(processor.drain(5.0), 0)
+        self.assertEqual(len(dropped), 1)
+        self.assertTrue(processor.get_memory_usage()["exhausted"])
+        self.assertLess(len(processor.processed_data), 1000)
+
+if __name__ == "__main__":
+    unittest.main()
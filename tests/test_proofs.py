@@ -0,0 +1,148 @@
+import json, logging, os, shutil, tempfile, threading, unittest
+from wearables_sdk.core import IntegritasClient, WearablesSDK
+from wearables_sdk.mock_server import MockIntegritasServer
+from wearables_sdk.transport import Transport, TransportResponse
+from wearables_sdk.proofs import (AnchorStore, ProofVerifier, UnsupportedProofFormat, format_proof, leaf_digest,
+                                  merkle_proofs)
+
+logging.getLogger("wearables_sdk").setLevel(logging.CRITICAL)
+
+def _records(n, anchor_id="1"):
+    records = [{"hash": f"{i:064x}", "timestamp": f"2024-01-01T00:00:{i:02d}Z"} for i in range(n)]
+    root, paths = merkle_proofs([leaf_digest(r["hash"], r["timestamp"]) for r in records])
+    for record, path in zip(records, paths):
+        record["proof"] = format_proof(anchor_id, path)
+    return root, records
+
+class TestProofVerifier(unittest.TestCase):
+    def test_every_leaf_verifies_for_any_tree_size(self):
+        for n in range(1, 10):
+            root, records = _records(n)
+            store = AnchorStore()
+            store.add([{"id": "1", "root": root.hex()}])
+            verifier = ProofVerifier(store)
+            self.assertTrue(all(verifier.verify(r) for r in records), n)
+
+    def test_tampered_records_fail(self):
+        root, records = _records(5)
+        store = AnchorStore()
+        store.add([{"id": "1", "root": root.hex()}])
+        verifier = ProofVerifier(store)
+        self.assertFalse(verifier.verify(dict(records[0], timestamp="2030-01-01T00:00:00Z")))
+        self.assertFalse(verifier.verify(dict(records[0], proof=records[1]["proof"])))
+        unknown_anchor = dict(json.loads(records[0]["proof"]), anchor="2")
+        self.assertFalse(verifier.verify(dict(records[0], proof=json.dumps(unknown_anchor))))
+        with self.assertRaises(UnsupportedProofFormat):
+            verifier.verify(dict(records[0], proof="legacy-hex-proof"))
+        self.assertEqual(verifier.stats()["unsupported"], 1)
+        # memoized digests must not let a forged leaf through
+        self.assertTrue(all(verifier.verify(r) for r in records))
+        self.assertFalse(verifier.verify(dict(records[2], hash="f" * 64)))
+
+    def test_shared_subtrees_are_memoized(self):
+        root, records = _records(64)
+        store = AnchorStore()
+        store.add([{"id": "1", "root": root.hex()}])
+        verifier = ProofVerifier(store)
+        self.assertTrue(all(verifier.verify(r) for r in records))
+        self.assertGreater(verifier.stats()["memo_hits"], 32)
+
+    def test_memo_is_bounded_per_anchor(self):
+        root, records = _records(1024)
+        store = AnchorStore()
+        store.add([{"id": "1", "root": root.hex()}])
+        verifier = ProofVerifier(store, memo_levels=4)
+        self.assertTrue(all(verifier.verify(r) for r in records))
+        self.assertLessEqual(len(verifier._proven["1"]), 2 ** 4)
+        self.assertGreater(verifier.stats()["memo_hits"], 1000)
+
+    def test_refresh_stops_when_the_cursor_does_not_advance(self):
+        calls = []
+
+        class NoCursor(Transport):  # answers every page with the same anchor and no "next"
+            def request(self, method, path, body=None, headers=None, timeout=(5, 10)):
+                calls.append(path)
+                return TransportResponse(200, "OK", {}, b'{"anchors":[{"id":"1","root":"' + b"00" * 32 + b'"}]}')
+
+        client = IntegritasClient("dummy", transport=NoCursor)
+        self.addCleanup(client.close)
+        store = AnchorStore(client=client)
+        self.assertEqual(store.refresh(), 1)
+        self.assertEqual(store.refresh(), 0)
+        self.assertEqual(len(calls), 2)
+
+    def test_anchor_store_persists(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        path = os.path.join(tmp, "anchors.json")
+        root, records = _records(3)
+        AnchorStore(path).add([{"id": "1", "root": root.hex()}], cursor="1")
+        reloaded = AnchorStore(path)
+        self.assertIn("1", reloaded)
+        self.assertTrue(ProofVerifier(reloaded).verify(records[2]))
+
+    def test_refresh_saves_once(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        pages = {None: ([{"id": "1", "root": "00" * 32}], "1"), "1": ([{"id": "2", "root": "11" * 32}], "2"),
+                 "2": ([], "2")}
+
+        class Client:
+            def fetch_anchors(self, since=None):
+                return pages[since]
+
+        store = AnchorStore(os.path.join(tmp, "anchors.json"), client=Client())
+        saves = []
+        save = store._save
+        store._save = lambda: (saves.append(1), save())
+        self.assertEqual(store.refresh(), 2)
+        self.assertEqual(len(saves), 1)
+        self.assertEqual(len(AnchorStore(store.path)), 2)
+
+    def test_end_to_end_with_mock_server(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        path = os.path.join(tmp, "anchors.json")
+        with MockIntegritasServer(anchor_interval=0.05) as server:
+            sdk = WearablesSDK("dummy", base_url=server.base_url)
+            try:
+                # concurrent requests within the anchor interval share an anchor
+                threads = [threading.Thread(target=sdk.integritas_client.timestamp_data, args=(f"{i:064x}",))
+                           for i in range(8)]
+                for t in threads:
+                    t.start()
+                for t in threads:
+                    t.join()
+                self.assertLess(len(server.anchors()), 8)
+
+                sdk.record_sensor_data("heart_rate", 70)
+                self.assertEqual(sdk.data_processor.drain(5.0), 0)
+                verifier = sdk.create_proof_verifier(path, refresh_interval=0)
+                record = sdk.get_verified_data()[0]
+                self.assertTrue(sdk.verify_timestamp(record, verifier))
+
+                sdk.record_sensor_data("heart_rate", 71)
+                self.assertEqual(sdk.data_processor.drain(5.0), 0)
+                # a record under an anchor published after the verifier was built triggers one refresh
+                self.assertTrue(sdk.verify_timestamp(sdk.get_verified_data()[1], verifier))
+                self.assertEqual(verifier.stats()["refreshes"], 1)
+                self.assertFalse(sdk.verify_timestamp(dict(record, timestamp="x"), verifier))
+            finally:
+                sdk.shutdown()
+        self.assertEqual(len(AnchorStore(path)), len(server.anchors()))
+
+    def test_mock_prunes_old_anchors(self):
+        with MockIntegritasServer(max_anchors=3) as server:
+            sdk = WearablesSDK("dummy", base_url=server.base_url)
+            try:
+                for i in range(5):
+                    sdk.integritas_client.timestamp_data(f"{i:064x}")
+                self.assertEqual([a["id"] for a in server.anchors()], ["3", "4", "5"])
+                anchors, cursor = sdk.integritas_client.fetch_anchors()
+                self.assertEqual(([a["id"] for a in anchors], cursor), (["3", "4", "5"], "5"))
+                self.assertEqual(sdk.integritas_client.fetch_anchors(cursor), ([], "5"))
+            finally:
+                sdk.shutdown()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest, json, random
+from wearables_sdk.schema import SensorSchema
+from wearables_sdk.security import ensure_json_compact
+
+TS = "2026-10-19T05:20:32.123456"
+
+def _generic(sensor_type, millis, value, metadata):
+    return ensure_json_compact({"id": f"{sensor_type}_{millis}", "sensor_type": sensor_type, "value": value,
+                                "timestamp_request": TS, "metadata": metadata or {}})
+
+class TestCanonicalEncoder(unittest.TestCase):
+    def assertIdentical(self, schema, value, metadata):
+        encoded = schema.compile().encode(1760851232123, TS, value, metadata)
+        self.assertEqual(encoded, _generic(schema.sensor_type, 1760851232123, value, metadata))
+
+    def test_byte_identical_to_generic_path(self):
+        hr = SensorSchema("heart_rate", int, {"unit": str})
+        self.assertIdentical(hr, 72, {"unit": "bpm"})
+        self.assertIdentical(hr, 72.5, {"unit": "bé\"m\n"})
+        self.assertIdentical(hr, True, {"unit": None})
+
+        vitals = SensorSchema("worker_vitals", {"heart_rate": int, "body_temperature": float},
+                              {"worker_id": str, "site_id": str, "alert_threshold_temp": float, "tags": list})
+        self.assertIdentical(vitals, {"heart_rate": 90, "body_temperature": 37},
+                             {"worker_id": "W-1", "site_id": "S", "alert_threshold_temp": 1e-7,
+                              "tags": [{"b": 1, "a": [1.5, None]}]})
+
+        rng = random.Random(3)
+        loc = SensorSchema("☃ loc", object, {"x": float, "y": float})
+        for _ in range(200):
+            value = rng.choice([rng.random() * 1e22, -0.0, rng.randint(-2**70, 2**70), "s", [1, {"z": 2}]])
+            self.assertIdentical(loc, value, {"x": rng.uniform(-1e3, 1e3), "y": rng.random()})
+
+    def test_shape_mismatch_falls_back(self):
+        enc = SensorSchema("heart_rate", int, {"unit": str}).compile()
+        self.assertIsNone(enc.encode(1, TS, 72, {"unit": "bpm", "extra": 1}))
+        self.assertIsNone(enc.encode(1, TS, 72, None))
+        self.assertIsNone(enc.encode(1, TS, float("nan"), {"unit": "bpm"}))
+        self.assertIsNone(enc.encode(1, TS, object(), {"unit": "bpm"}))
+
+    def test_metadata_size_validated_while_encoding(self):
+        enc = SensorSchema("x", int, {"data": str, "n": int}).compile()
+        for size in (1000, 1005, 1006, 1007, 1100):
+            metadata = {"data": "x" * size, "n": 1}
+            too_big = len(json.dumps(metadata)) > 1024
+            if too_big:
+                with self.assertRaises(ValueError):
+                    enc.encode(1, TS, 1, metadata, max_metadata_size=1024)
+            else:
+                self.assertIsNotNone(enc.encode(1, TS, 1, metadata, max_metadata_size=1024))
+
+    def test_rejects_unsupported_declarations(self):
+        with self.assertRaises(TypeError):
+            SensorSchema("x", bytes)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+import errno, gzip, json, logging, os, shutil, tempfile, time, unittest
+from wearables_sdk import sync
+from wearables_sdk.sync import DeltaReplicator
+from wearables_sdk.transport import Transport, TransportResponse
+from helpers import start_processor
+
+logging.getLogger("wearables_sdk").setLevel(logging.CRITICAL)
+
+class _Collector(Transport):
+    """Records batches; fails the first `failures` requests with the given status"""
+    batches = []
+    failures = 0
+    fail_status = 503
+    retry_after = None
+
+    def request(self, method, path, body=None, headers=None, timeout=(5, 10)):
+        cls = type(self)
+        if cls.failures:
+            cls.failures -= 1
+            headers = {"retry-after": cls.retry_after} if cls.retry_after is not None else {}
+            return TransportResponse(cls.fail_status, "Unavailable", headers)
+        cls.batches.append((headers["Idempotency-Key"], json.loads(gzip.decompress(body))))
+        return TransportResponse(200, "OK")
+
+class TestDeltaReplicator(unittest.TestCase):
+    def setUp(self):
+        _Collector.batches = []
+        _Collector.failures = 0
+        _Collector.fail_status = 503
+        _Collector.retry_after = None
+        self.state_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.state_dir)
+        self.processor = start_processor(self)
+
+    def _record(self, n):
+        for i in range(n):
+            self.processor.add_sensor_reading("steps", i)
+        self.assertEqual(self.processor.drain(5.0), 0)
+
+    def _replicator(self, **kwargs):
+        kwargs.setdefault("linger", 0)
+        replicator = DeltaReplicator(self.processor, "http://collector", self.state_dir, name="site",
+                                     transport=_Collector, batch_size=10, **kwargs)
+        self.addCleanup(replicator.stop)
+        return replicator.start()
+
+    def test_sends_only_the_delta(self):
+        replicator = self._replicator()
+        self._record(15)
+        self.assertTrue(replicator.sync_now(5.0))
+        self._record(3)
+        self.assertTrue(replicator.sync_now(5.0))
+        ranges = [(b["from_seq"], b["to_seq"]) for _, b in _Collector.batches]
+        self.assertEqual(ranges[-1], (15, 18))
+        self.assertEqual(sum(len(b["records"]) for _, b in _Collector.batches), 18)
+        self.assertEqual(replicator.status()["lag"], 0)
+        self.assertEqual(len({key for key, _ in _Collector.batches}), len(_Collector.batches))
+
+    def test_resumes_from_persisted_high_water_mark(self):
+        self._record(5)
+        first = self._replicator()
+        self.assertTrue(first.sync_now(5.0))
+        first.stop()
+        self._record(2)
+        replicator = self._replicator()
+        self.assertEqual(replicator.acked_seq, 5)
+        self.assertTrue(replicator.sync_now(5.0))
+        self.assertEqual([(b["from_seq"], b["to_seq"]) for _, b in _Collector.batches], [(0, 5), (5, 7)])
+
+    def test_spooled_batch_is_resent_with_same_key_after_restart(self):
+        self._record(4)
+        _Collector.failures = 10 ** 9
+        replicator = self._replicator(backoff=0.01, max_backoff=0.01)
+        deadline = time.monotonic() + 5.0
+        while replicator.status()["in_flight"] is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        key = replicator.status()["in_flight"]["batch_id"]
+        replicator.stop()
+        self.assertTrue(os.path.exists(os.path.join(self.state_dir, "sync-site.batch.gz")))
+
+        # a new process has a new store; the spooled batch from the old one still goes out first
+        self.processor = start_processor(self)
+        _Collector.failures = 2
+        _Collector.fail_status = 429
+        _Collector.retry_after = "0"
+        replicator = self._replicator(backoff=10.0)
+        self.assertTrue(replicator.sync_now(5.0))
+        self.assertEqual([k for k, _ in _Collector.batches], [key])
+        self.assertEqual(len(_Collector.batches[0][1]["records"]), 4)
+        self.assertEqual(replicator.acked_seq, 0)
+        self.assertFalse(os.path.exists(os.path.join(self.state_dir, "sync-site.batch.gz")))
+
+    def test_rejected_batch_is_dead_lettered(self):
+        self._record(12)
+        _Collector.failures = 3
+        _Collector.fail_status = 413
+        replicator = self._replicator(backoff=0.01, max_backoff=0.01, max_rejections=3)
+        self.assertTrue(replicator.sync_now(5.0))
+        status = replicator.status()
+        self.assertEqual(status["lag"], 0)
+        self.assertEqual(status["dead_lettered"], 1)
+        self.assertEqual(len(status["dead_letters"]), 1)
+        with gzip.open(status["dead_letters"][0]) as f:
+            self.assertEqual(json.loads(f.read())["from_seq"], 0)
+        self.assertEqual([(b["from_seq"], b["to_seq"]) for _, b in _Collector.batches], [(10, 12)])
+
+    def test_replicators_cannot_share_state_files(self):
+        first = self._replicator()
+        other = start_processor(self)
+        with self.assertRaises(RuntimeError):
+            DeltaReplicator(other, "http://collector", self.state_dir, name="site", transport=_Collector)
+        second = DeltaReplicator(other, "http://collector", self.state_dir, name="device-2", transport=_Collector)
+        self.addCleanup(second.stop)
+        first.stop()
+        self._replicator()  # released by stop
+
+    def test_recovers_from_a_failed_spool_write(self):
+        write = sync._write_atomic
+        failures = [1]
+        def full_disk(path, data):
+            if failures[0]:
+                failures[0] -= 1
+                raise OSError(errno.ENOSPC, "No space left on device")
+            write(path, data)
+        sync._write_atomic = full_disk
+        self.addCleanup(setattr, sync, "_write_atomic", write)
+        self._record(5)
+        replicator = self._replicator(backoff=0.01)
+        self.assertTrue(replicator.sync_now(5.0))
+        status = replicator.status()
+        self.assertEqual((status["lag"], status["errors"], status["last_error"]), (0, 1, None))
+        self.assertEqual([(b["from_seq"], b["to_seq"]) for _, b in _Collector.batches], [(0, 5)])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest, logging
+from wearables_sdk.core import IntegritasClient, sha3_256
+from wearables_sdk.mock_server import MockIntegritasServer
+from wearables_sdk.transport import HttpClientTransport, RequestsTransport, make_transport
+
+logging.getLogger("wearables_sdk").setLevel(logging.CRITICAL)
+
+class TestTransports(unittest.TestCase):
+    def test_same_semantics_across_transports(self):
+        data_hash = sha3_256(b"reading").hexdigest()
+        with MockIntegritasServer() as server:
+            for name in ("requests", "http.client"):
+                client = IntegritasClient("key", base_url=server.base_url, transport=name)
+                try:
+                    result = client.timestamp_data(data_hash)
+                finally:
+                    client.close()
+                self.assertTrue(result.success, name)
+                self.assertEqual(result.hash, data_hash)
+                self.assertTrue(result.timestamp and result.proof)
+
+    def test_http_errors_map_to_failed_response(self):
+        with MockIntegritasServer(rate_limit=1, burst=1) as server:
+            for name in ("requests", "http.client"):
+                client = IntegritasClient("key", base_url=server.base_url, transport=name)
+                try:
+                    client.timestamp_data("00")
+                    result = client.timestamp_data("00")
+                finally:
+                    client.close()
+                self.assertFalse(result.success)
+                self.assertTrue(result.error.startswith("429 Client Error"), result.error)
+
+    def test_http_client_reuses_connection(self):
+        with MockIntegritasServer() as server:
+            transport = HttpClientTransport(server.base_url, {"Authorization": "Bearer key"})
+            try:
+                transport.post_timestamp("aa")
+                conn = transport._pool[0]
+                sock = conn.sock
+                response = transport.post_timestamp("bb")
+                self.assertEqual(response.status, 200)
+                self.assertEqual(response.json()["hash"], "bb")
+                self.assertIs(transport._pool[0].sock, sock)
+                response = transport.post_timestamp("\u00e91")  # alphanumeric but not ASCII
+                self.assertEqual(response.status, 200)
+                self.assertEqual(response.json()["hash"], "\u00e91")
+            finally:
+                transport.close()
+
+    def test_make_transport(self):
+        self.assertIsInstance(make_transport(None, "http://localhost", {}), RequestsTransport)
+        self.assertIsInstance(make_transport(HttpClientTransport, "http://localhost", {}), HttpClientTransport)
+        with self.assertRaises(ValueError):
+            make_transport("carrier-pigeon", "http://localhost", {})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,168 @@
+# wearables_sdk/aggregates.py
+"""Incremental aggregates over the verified (timestamped) stream.
+
+An ``Aggregate`` keeps count, sum, min, max, mean and an optional EWMA per
+group (a metadata key's value), all-time or over a tumbling or sliding window.
+Each committed record updates it in amortised O(1): sliding windows keep a
+deque of samples plus monotonic deques for min and max, so expiry never rescans.
+
+Readings are bucketed by when they were committed (timestamped), not by when
+they were taken: a reading that waited in the queue or was retried lands in the
+window current at its commit. Sliding windows are measured on ``clock``, which
+only moves forward; tumbling windows are aligned on ``wall_clock`` (epoch
+seconds), so a reported ``window_start`` is a real point in time.
+"""
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, Optional
+
+_NUMBER = (int, float)
+
+
+class _Stats:
+    __slots__ = ("count", "total", "min", "max", "ewma", "window_start", "samples", "min_q", "max_q")
+
+    def __init__(self, sliding: bool):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.ewma = None
+        self.window_start = None
+        # sliding only: (t, value) samples and monotonic (t, value) deques for min / max
+        self.samples = deque() if sliding else None
+        self.min_q = deque() if sliding else None
+        self.max_q = deque() if sliding else None
+
+    def reset(self, window_start: float):
+        self.count, self.total, self.min, self.max = 0, 0.0, None, None
+        self.window_start = window_start
+
+    def add(self, now: float, v: float, alpha: Optional[float]):
+        self.count += 1
+        self.total += v
+        if alpha is not None:
+            self.ewma = v if self.ewma is None else self.ewma + alpha * (v - self.ewma)
+        if self.samples is None:
+            if self.min is None or v < self.min:
+                self.min = v
+            if self.max is None or v > self.max:
+                self.max = v
+            return
+        self.samples.append((now, v))
+        while self.min_q and self.min_q[-1][1] >= v:
+            self.min_q.pop()
+        self.min_q.append((now, v))
+        while self.max_q and self.max_q[-1][1] <= v:
+            self.max_q.pop()
+        self.max_q.append((now, v))
+
+    def expire(self, cutoff: float):
+        """Sliding windows: drop samples at or before cutoff"""
+        samples = self.samples
+        while samples and samples[0][0] <= cutoff:
+            self.count -= 1
+            self.total -= samples.popleft()[1]
+        while self.min_q and self.min_q[0][0] <= cutoff:
+            self.min_q.popleft()
+        while self.max_q and self.max_q[0][0] <= cutoff:
+            self.max_q.popleft()
+        if not samples:
+            self.total = 0.0  # shed accumulated float error whenever the window empties
+
+    def summary(self) -> Dict[str, Any]:
+        if self.samples is not None:
+            low = self.min_q[0][1] if self.min_q else None
+            high = self.max_q[0][1] if self.max_q else None
+        else:
+            low, high = self.min, self.max
+        result = {"count": self.count, "sum": self.total, "min": low, "max": high,
+                  "mean": self.total / self.count if self.count else None}
+        if self.ewma is not None:
+            result["ewma"] = self.ewma
+        if self.window_start is not None:
+            result["window_start"] = self.window_start
+        return result
+
+
+class Aggregate:
+    """Rolling statistics over committed records.
+
+    sensor_type: only records of this type (None: all). group_by: metadata key
+    whose value selects the group (None: one group). field: metadata key holding
+    the number to aggregate (default: the reading's value); records without a
+    numeric value are ignored. window: seconds; sliding=True keeps the last
+    window seconds, otherwise windows tumble on multiples of window since the
+    Unix epoch and ``window_start`` is in epoch seconds. ewma_alpha: weight of
+    each new sample in the exponentially weighted mean (which carries across
+    tumbling windows).
+    """
+
+    def __init__(self, name: str, sensor_type: Optional[str] = None, group_by: Optional[str] = None,
+                 field: Optional[str] = None, window: Optional[float] = None, sliding: bool = False,
+                 ewma_alpha: Optional[float] = None, clock: Callable[[], float] = time.monotonic,
+                 wall_clock: Callable[[], float] = time.time):
+        if window is not None and window <= 0:
+            raise ValueError("window must be positive")
+        if ewma_alpha is not None and not 0 < ewma_alpha <= 1:
+            raise ValueError("ewma_alpha must be in (0, 1]")
+        self.name = name
+        self.sensor_type = sensor_type
+        self.group_by = group_by
+        self.field = field
+        self.window = window
+        self.sliding = sliding and window is not None
+        self.ewma_alpha = ewma_alpha
+        self._clock = clock
+        self._wall_clock = wall_clock
+        self._lock = threading.Lock()
+        self._groups: Dict[Any, _Stats] = {}
+
+    def update(self, records: Iterable[Dict]):
+        """Fold committed records into the aggregate"""
+        now, wall = self._clock(), self._wall_clock()
+        with self._lock:
+            for record in records:
+                data = record["original_data"]
+                if self.sensor_type is not None and data["sensor_type"] != self.sensor_type:
+                    continue
+                metadata = data["metadata"]
+                v = data["value"] if self.field is None else metadata.get(self.field)
+                if type(v) not in _NUMBER:  # bool and None are not samples
+                    continue
+                group = metadata.get(self.group_by) if self.group_by is not None else None
+                stats = self._groups.get(group)
+                if stats is None:
+                    stats = self._groups[group] = _Stats(self.sliding)
+                self._roll(stats, now, wall)
+                stats.add(now, v, self.ewma_alpha)
+
+    def _roll(self, stats: _Stats, now: float, wall: float):
+        if self.window is None:
+            return
+        if self.sliding:
+            stats.expire(now - self.window)
+            return
+        start = wall - wall % self.window
+        # only roll forward: a wall clock stepped back must not discard the current window
+        if stats.window_start is None or start > stats.window_start:
+            stats.reset(start)
+
+    def get(self, group: Any = None) -> Optional[Dict[str, Any]]:
+        """Summary for one group, or None if it has no samples yet"""
+        now, wall = self._clock(), self._wall_clock()
+        with self._lock:
+            stats = self._groups.get(group)
+            if stats is None:
+                return None
+            self._roll(stats, now, wall)
+            return stats.summary()
+
+    def groups(self) -> Dict[Any, Dict[str, Any]]:
+        """Summaries of every group seen so far"""
+        now, wall = self._clock(), self._wall_clock()
+        with self._lock:
+            for stats in self._groups.values():
+                self._roll(stats, now, wall)
+            return {group: stats.summary() for group, stats in self._groups.items()}
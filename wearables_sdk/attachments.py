@@ -0,0 +1,164 @@
+# wearables_sdk/attachments.py
+"""Binary attachments for raw sensor buffers (PPG frames, audio snippets, ...).
+
+A buffer is hashed in place through a ``memoryview`` and only its SHA3-256
+digest and length go into the reading's canonical envelope, so nothing is
+base64-encoded or copied into the JSON record. ``AttachmentStore`` keeps the
+bytes beside the processed store, content-addressed by digest: small buffers
+in memory, large ones (or all of them once ``max_memory`` is reached) spilled
+to files in ``spill_dir``.
+"""
+import os
+import threading
+from typing import Dict, Optional, Tuple, Union
+
+try:
+    from hashlib import sha3_256
+except ImportError:  # pragma: no cover - legacy interpreters
+    from sha3 import sha3_256
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+def describe_attachment(buffer: Buffer) -> Tuple[memoryview, Dict]:
+    """Return (byte view of buffer, {"length", "sha3_256"} descriptor) without copying the data"""
+    if not isinstance(buffer, (bytes, bytearray, memoryview)):
+        raise TypeError(f"Attachment must be bytes, bytearray or memoryview, not {type(buffer).__name__}")
+    view = memoryview(buffer)
+    if not view.c_contiguous:
+        raise ValueError("Attachment buffer must be C-contiguous")
+    if view.format != "B" or view.ndim != 1:
+        view = view.cast("B")
+    return view, {"length": view.nbytes, "sha3_256": sha3_256(view).hexdigest()}
+
+
+class AttachmentStore:
+    """Content-addressed attachment bytes, in memory or spilled to spill_dir.
+
+    spill_threshold: buffers of at least this many bytes go straight to disk.
+    max_memory: once in-memory attachments reach this many bytes, new ones are
+    spilled too. Both only apply when spill_dir is set. Immutable ``bytes`` are
+    kept by reference; mutable buffers are copied (or written out) at ``put`` so
+    later changes by the caller cannot break the recorded digest.
+    """
+
+    def __init__(self, spill_dir: Optional[str] = None, spill_threshold: int = 64 * 1024,
+                 max_memory: Optional[int] = None):
+        self.spill_dir = spill_dir
+        self.spill_threshold = spill_threshold
+        self.max_memory = max_memory
+        if spill_dir is not None:
+            os.makedirs(spill_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._memory: Dict[str, bytes] = {}
+        self._spilled: Dict[str, int] = {}  # digest -> length
+        self._refs: Dict[str, int] = {}
+        self._writing: Dict[str, int] = {}  # digest -> puts still writing its file
+        self.memory_bytes = 0
+
+    def __contains__(self, digest: str) -> bool:
+        return digest in self._refs
+
+    def __len__(self):
+        return len(self._refs)
+
+    def put(self, view: memoryview, digest: str):
+        """Store the bytes of view under digest (a repeat put only adds a reference)"""
+        with self._lock:
+            if digest in self._refs:
+                self._refs[digest] += 1
+                return
+            spill = self.spill_dir is not None and (
+                view.nbytes >= self.spill_threshold
+                or (self.max_memory is not None and self.memory_bytes + view.nbytes > self.max_memory))
+            if spill:
+                # registered before the write, so a concurrent discard leaves the file to us
+                self._spilled[digest] = view.nbytes
+                self._writing[digest] = self._writing.get(digest, 0) + 1
+            else:
+                data = view.obj if type(view.obj) is bytes and view.nbytes == len(view.obj) else view.tobytes()
+                self._memory[digest] = data
+                self.memory_bytes += len(data)
+            self._refs[digest] = 1
+        if spill:
+            try:
+                self._write(digest, view)
+            finally:
+                with self._lock:
+                    writers = self._writing.pop(digest) - 1
+                    if writers:
+                        self._writing[digest] = writers
+                    orphaned = not writers and digest not in self._spilled  # discarded while being written
+            if orphaned:
+                self._remove(digest)
+
+    def get(self, digest: str) -> Optional[bytes]:
+        data = self._memory.get(digest)
+        if data is not None:
+            return data
+        if digest not in self._spilled:
+            return None
+        try:
+            with open(self._path(digest), "rb") as f:
+                return f.read()
+        except FileNotFoundError:  # discarded (or still being written) meanwhile
+            return None
+
+    def discard(self, digest: str):
+        """Drop one reference; the bytes are removed with the last one"""
+        with self._lock:
+            refs = self._refs.get(digest, 0) - 1
+            if refs > 0:
+                self._refs[digest] = refs
+                return
+            self._refs.pop(digest, None)
+            data = self._memory.pop(digest, None)
+            if data is not None:
+                self.memory_bytes -= len(data)
+            # a put still writing the file removes it when done
+            remove = self._spilled.pop(digest, None) is not None and digest not in self._writing
+        if remove:
+            self._remove(digest)
+
+    def spill_memory(self, target_bytes: int) -> int:
+        """Write in-memory attachments to spill_dir, oldest first, until at most target_bytes remain in memory"""
+        if self.spill_dir is None:
+            return 0
+        freed = 0
+        while True:
+            with self._lock:
+                if self.memory_bytes <= target_bytes or not self._memory:
+                    return freed
+                digest = next(iter(self._memory))
+                data = self._memory[digest]
+            self._write(digest, memoryview(data))
+            with self._lock:
+                if self._memory.pop(digest, None) is not None:
+                    self.memory_bytes -= len(data)
+                    freed += len(data)
+                    if digest in self._refs:
+                        self._spilled[digest] = len(data)
+                        continue
+                # discarded while being written
+                self._remove(digest)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"attachments": len(self._refs), "memory_bytes": self.memory_bytes,
+                    "spilled": len(self._spilled), "spilled_bytes": sum(self._spilled.values())}
+
+    def _write(self, digest: str, view: memoryview):
+        path = self._path(digest)
+        tmp = f"{path}.{threading.get_ident()}.tmp"  # concurrent writers of one digest must not share it
+        with open(tmp, "wb") as f:
+            f.write(view)
+        os.replace(tmp, path)
+
+    def _remove(self, digest: str):
+        try:
+            os.remove(self._path(digest))
+        except FileNotFoundError:
+            pass
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.spill_dir, f"{digest}.bin")
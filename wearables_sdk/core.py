@@ -4,12 +4,25 @@ import time
 import threading
 import queue
 import logging
-from typing import Dict, Any, Optional, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, List, Iterator
 from dataclasses import dataclass
 from datetime import datetime
 import sys
+import uuid
+import os
+import urllib.parse
 
 from .security import ensure_json_compact, sha256_cert_fingerprint, matches_any_fingerprint
+from .logging_utils import EventLog
+from .transport import Transport, TIMESTAMP_PATH, make_transport
+from .limiter import AdaptiveConcurrencyLimiter, THROTTLE_STATUSES, parse_retry_after
+from .schema import SensorSchema
+from .sync import DeltaReplicator
+from .proofs import ANCHORS_PATH, AnchorStore, ProofVerifier
+from .attachments import AttachmentStore, Buffer, describe_attachment
+from .aggregates import Aggregate
+from .memory import MemoryGovernor, SpillableStore, claim_spill_dir
 
 # Platform detection
 IS_ANDROID = 'android' in sys.platform.lower()
@@ -30,6 +43,9 @@ except AttributeError:
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+DEFAULT_BASE_URL = "https://api.integritas.minima.global"
+MAX_METADATA_SIZE = 1024  # bytes, measured as len(json.dumps(metadata))
+
 @dataclass
 class TimestampResponse:
     """Response structure from Integritas API"""
@@ -38,21 +54,33 @@ class TimestampResponse:
     hash: Optional[str] = None
     proof: Optional[str] = None
     error: Optional[str] = None
+    status_code: Optional[int] = None  # None if no HTTP response was received
+    retry_after: Optional[float] = None  # seconds, from the Retry-After header
+
+    @property
+    def throttled(self) -> bool:
+        return self.status_code in THROTTLE_STATUSES
 
 class IntegritasClient:
     """Handles communication with Integritas Minima Global API"""
-    def __init__(self, api_key: str, base_url: str = "https://api.integritas.minima.global", cert_fingerprints: Optional[List[str]] = None):
+    def __init__(self, api_key: str, base_url: str = DEFAULT_BASE_URL, cert_fingerprints: Optional[List[str]] = None,
+                 event_log: Optional[EventLog] = None, transport=None):
         self.api_key = api_key
         self.base_url = base_url.rstrip('/')
         self._cert_fingerprints = cert_fingerprints or []
-        import requests
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.events = event_log or EventLog(logger)
+        # transport: "requests" (default), "http.client", or a (base_url, headers) -> Transport factory
+        self.transport: Transport = make_transport(transport, self.base_url, {
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json",
             "User-Agent": f"WearablesSDK/1.1 ({sys.platform})"
         })
 
+    @property
+    def session(self):
+        """Underlying ``requests.Session`` when using the requests transport"""
+        return getattr(self.transport, "session", None)
+
     def timestamp_data(self, data_hash: str) -> TimestampResponse:
         """Send SHA3 hash to Integritas for timestamping"""
         try:
@@ -67,87 +95,413 @@ class IntegritasClient:
                     if not matches_any_fingerprint(actual_fp, self._cert_fingerprints):
                         raise RuntimeError(f"TLS pinning failed: got {actual_fp}")
                 except Exception as _e:
-                    logger.error(f"TLS pinning preflight failed: {_e}")
+                    logger.error("TLS pinning preflight failed: %s", _e)
                     return TimestampResponse(success=False, error=str(_e))
 
-            response = self.session.post(
-                f"{self.base_url}/v1/timestamp",
-                json={"hash": data_hash},
-                timeout=(5, 10)
-            )
-            response.raise_for_status()
+            response = self.transport.post_timestamp(data_hash, timeout=(5, 10))
+            if response.status >= 400:
+                kind = "Client" if response.status < 500 else "Server"
+                error = f"{response.status} {kind} Error: {response.reason} for url: {self.base_url}{TIMESTAMP_PATH}"
+                self.events.event("request_failed", logging.ERROR, "Timestamp request failed: %s", error)
+                return TimestampResponse(success=False, error=error, status_code=response.status,
+                                         retry_after=parse_retry_after(response.headers.get("retry-after")))
             data = response.json()
             return TimestampResponse(
                 success=True,
                 timestamp=data.get("timestamp"),
                 hash=data.get("hash"),
-                proof=data.get("proof")
+                proof=data.get("proof"),
+                status_code=response.status
             )
         except Exception as e:
-            logger.error(f"Timestamp request failed: {str(e)}")
+            self.events.event("request_failed", logging.ERROR, "Timestamp request failed: %s", e)
             return TimestampResponse(success=False, error=str(e))
 
+    def fetch_anchors(self, since: Optional[str] = None, limit: int = 1000):
+        """Fetch published anchors after cursor since; returns (anchors, next cursor)"""
+        query = urllib.parse.urlencode({"limit": limit, **({"since": since} if since is not None else {})})
+        response = self.transport.request("GET", f"{ANCHORS_PATH}?{query}", timeout=(5, 30))
+        if response.status >= 400:
+            raise RuntimeError(f"{response.status} Error: {response.reason} for url: {self.base_url}{ANCHORS_PATH}")
+        data = response.json()
+        return data.get("anchors", []), data.get("next", since)
+
+    def close(self):
+        self.transport.close()
+
+class _StagingBuffer:
+    """Readings staged by one producer thread; the lock is only contended by flush sweeps"""
+    __slots__ = ("items", "first_at", "lock", "owner")
+
+    def __init__(self):
+        self.items = []
+        self.first_at = 0.0
+        self.lock = threading.Lock()
+        self.owner = threading.current_thread()
+
+class _Batch:
+    """Readings taken from one queue entry; the entry is done when all of them are"""
+    __slots__ = ("remaining", "committed", "lock")
+
+    def __init__(self, size: int):
+        self.remaining = size
+        self.committed = []
+        self.lock = threading.Lock()
+
+# Queue entry that only wakes the worker so it sweeps staging buffers
+_WAKE = object()
+
 class WearableDataProcessor:
     """Processes wearable sensor data with SHA3 hashing"""
-    def __init__(self, integritas_client: IntegritasClient, on_queue_overflow=None):
+    max_throttle_retries = 10  # throttled requests are retried without using the normal retry budget
+    staging_buffer_batches = 4  # a thread's staging buffer holds at most this many batches before dropping
+
+    def __init__(self, integritas_client: IntegritasClient, on_queue_overflow=None, on_timestamped=None,
+                 event_log: Optional[EventLog] = None, idle_timeout: Optional[float] = None,
+                 limiter: Optional[AdaptiveConcurrencyLimiter] = None, staging_batch_size: Optional[int] = None,
+                 staging_max_delay: float = 0.05, attachment_store: Optional[AttachmentStore] = None,
+                 memory_budget: Optional[int] = None, spill_dir: Optional[str] = None):
         self.client = integritas_client
+        self.events = event_log or integritas_client.events
+        if memory_budget and spill_dir is None:
+            # verified records could never leave memory, so every reading would be refused once it filled
+            raise ValueError("memory_budget requires spill_dir")
         self.pending_queue = queue.Queue(maxsize=100)
-        self.processed_data = []
+        # Identifies this processed store; a record's seq is its position in it
+        self.store_id = uuid.uuid4().hex
+        # List-like; with spill_dir its oldest records can be moved to disk
+        self.processed_data = SpillableStore(spill_dir, self.store_id, track_sizes=bool(memory_budget))
+        # With a budget, estimated bytes held in memory are kept under memory_budget by
+        # spilling to spill_dir; readings are refused while that is not enough.
+        self.memory = MemoryGovernor(memory_budget) if memory_budget else None
+        self._retrying = 0
+        self._commit_listeners = []
+        self._aggregates: Dict[str, Aggregate] = {}
+        # Attachment bytes live here, keyed by digest; records only carry the descriptor
+        if attachment_store is None:
+            if spill_dir:
+                attachments_dir = os.path.join(spill_dir, f"attachments-{self.store_id}")
+                attachment_store = AttachmentStore(attachments_dir)
+                claim_spill_dir(attachments_dir, attachment_store)
+            else:
+                attachment_store = AttachmentStore()
+        self.attachments = attachment_store
         self.on_queue_overflow = on_queue_overflow
+        self.on_timestamped = on_timestamped
+        # None: worker blocks until work or shutdown, never waking while idle.
+        # A number: worker exits after that many idle seconds and restarts on the next reading.
+        self.idle_timeout = idle_timeout
+        # With a limiter, requests run concurrently on a pool sized to limiter.max_limit
+        self.limiter = limiter
+        # With staging, each producer thread buffers readings and hands them to the queue
+        # as one entry of up to staging_batch_size readings, or once staging_max_delay
+        # has passed since the first one. pending_queue's bound then counts batches.
+        self.staging_batch_size = staging_batch_size
+        self.staging_max_delay = staging_max_delay
+        self._staging = threading.local()
+        self._staging_buffers = []
+        self._next_sweep = 0.0
+        self._worker_waiting = False
+        self._executor = None
+        self._encoders = {}  # sensor_type -> CanonicalEncoder
+        self._in_flight = 0
+        self._in_flight_lock = threading.Lock()
         self._worker_thread = None
         self._stop_event = threading.Event()
         self._lock = threading.RLock()
+        self._lifecycle_lock = threading.Lock()
 
     def start_background_processing(self):
         """Start background thread"""
-        if self._worker_thread is None:
-            self._worker_thread = threading.Thread(target=self._process_queue, name="TimestampWorker")
-            self._worker_thread.daemon = True
-            self._worker_thread.start()
-
-    def stop_background_processing(self):
-        """Stop background processing"""
-        self._stop_event.set()
-        if self._worker_thread:
+        with self._lifecycle_lock:
+            self._stop_event.clear()
+            self._discard_stop_sentinels()
+        self._ensure_worker()
+
+    def _discard_stop_sentinels(self):
+        """Remove stop markers left in the queue by an earlier stop, so a new worker does not exit on them"""
+        q = self.pending_queue
+        with q.mutex:
+            kept = [e for e in q.queue if e is not None]
+            removed = len(q.queue) - len(kept)
+            if not removed:
+                return
+            q.queue.clear()
+            q.queue.extend(kept)
+            q.unfinished_tasks -= removed
+            if not q.unfinished_tasks:
+                q.all_tasks_done.notify_all()
+            q.not_full.notify(removed)
+
+    def _ensure_worker(self):
+        """(Re)start the worker unless it is running or processing was stopped"""
+        with self._lifecycle_lock:
+            if self._stop_event.is_set():
+                return
+            if self._worker_thread is None or not self._worker_thread.is_alive():
+                self._worker_thread = threading.Thread(target=self._process_queue, name="TimestampWorker")
+                self._worker_thread.daemon = True
+                self._worker_thread.start()
+
+    def stop_background_processing(self, timeout: float = 2.0, drain_timeout: Optional[float] = None) -> int:
+        """Stop background processing, optionally draining the queue first.
+
+        Waits up to drain_timeout seconds for queued readings to be timestamped,
+        then up to timeout seconds for the worker to exit. Returns the number of
+        readings left pending.
+        """
+        if drain_timeout:
+            self.drain(drain_timeout)
+        with self._lifecycle_lock:
+            self._stop_event.set()
+            worker = self._worker_thread
+        left = self._unfinished_count()
+        if worker is not None and worker.is_alive():
             try:
                 self.pending_queue.put_nowait(None)
             except queue.Full:
-                pass
-            self._worker_thread.join(timeout=2.0)
+                pass  # worker is busy and will see the stop flag after its current item
+            worker.join(timeout=timeout)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        return left
+
+    def drain(self, timeout: Optional[float] = None) -> int:
+        """Wait until queued readings are processed or timeout expires; returns readings still pending.
+
+        Returns at once while processing is stopped, since nothing would make progress.
+        """
+        if self._stop_event.is_set():
+            return self._unfinished_count()
+        self.flush_staged()
+        self._ensure_worker()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        done = self.pending_queue.all_tasks_done
+        with done:
+            while self.pending_queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                done.wait(remaining)
+        return self._unfinished_count()
+
+    def _unfinished_count(self) -> int:
+        return self.get_pending_count() + self._in_flight
+
+    def _park_or_exit(self) -> bool:
+        """Called after idle_timeout with no work; returns True if the worker should exit"""
+        with self._lifecycle_lock:
+            # Clear the handle before re-checking the queue: a producer that enqueues
+            # after this check will see no worker and start a new one.
+            self._worker_thread = None
+            if (self.pending_queue.empty() and not self._has_staged()) or self._stop_event.is_set():
+                return True
+            self._worker_thread = threading.current_thread()
+            return False
 
     def _process_queue(self):
-        """Background worker"""
+        """Background worker: blocks on the queue, no periodic wakeups"""
         while not self._stop_event.is_set():
+            timeout = self.idle_timeout
+            if self.staging_batch_size:
+                # Announce the wait before checking the buffers; a producer staging
+                # into an empty buffer after the check will see the flag and wake us.
+                self._worker_waiting = True
+                if self._has_staged():
+                    timeout = min(self.staging_max_delay, timeout or self.staging_max_delay)
             try:
-                item = self.pending_queue.get(timeout=1)
-                if item is None:
-                    break
+                entry = self.pending_queue.get(timeout=timeout)
+            except queue.Empty:
+                if self.staging_batch_size and self._sweep_staging(force=False):
+                    continue
+                if timeout == self.idle_timeout and self._park_or_exit():
+                    return
+                continue
+            finally:
+                self._worker_waiting = False
 
+            if entry is None:
+                self.pending_queue.task_done()
+                break
+            if entry is _WAKE:
+                self.pending_queue.task_done()
+                self._sweep_staging(force=False)
+                continue
+            items = entry if isinstance(entry, list) else [entry]
+            with self._in_flight_lock:
+                self._in_flight += len(items)
+            if self.limiter is not None:
+                self._dispatch(items, _Batch(len(items)))
+            else:
+                self._process_batch(items)
+            if self.staging_batch_size and time.monotonic() >= self._next_sweep:
+                self._sweep_staging(force=False)
+
+    def _process_batch(self, items: List[Dict]):
+        committed = []
+        try:
+            for item in items:
+                try:
+                    self._handle_result(item, self.client.timestamp_data(item['hash']), committed)
+                except Exception as e:
+                    logger.exception("Queue processing error: %s", e)
+            self._commit(committed)
+        finally:
+            with self._in_flight_lock:
+                self._in_flight -= len(items)
+            self.pending_queue.task_done()
+            self._govern()
+
+    def _dispatch(self, items: List[Dict], batch: _Batch):
+        """Hand items to the request pool as the limiter grants slots"""
+        for i, item in enumerate(items):
+            while not self.limiter.acquire(timeout=0.5):
+                if self._stop_event.is_set():
+                    rest = items[i:]
+                    try:
+                        self.pending_queue.put_nowait(rest if len(rest) > 1 else rest[0])
+                    except queue.Full:
+                        pass
+                    self._complete(batch, len(rest))
+                    return
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.limiter.max_limit,
+                                                    thread_name_prefix="TimestampRequest")
+            self._executor.submit(self._limited_request, item, batch)
+
+    def _limited_request(self, item: Dict, batch: _Batch):
+        try:
+            start = time.monotonic()
+            result = None
+            try:
                 result = self.client.timestamp_data(item['hash'])
-                with self._lock:
-                    if result.success:
-                        item['timestamp'] = result.timestamp
-                        item['proof'] = result.proof
-                        self.processed_data.append(item)
-                        logger.info(f"Timestamped: {item['id']}")
-                    else:
-                        logger.error(f"Failed {item['id']}: {result.error}")
-                        if item.get('retry_count', 0) < 2:
-                            item['retry_count'] = item.get('retry_count', 0) + 1
-                            try:
-                                self.pending_queue.put_nowait(item)
-                            except queue.Full:
-                                logger.warning("Queue full, dropping retry")
+            finally:
+                # always return the slot; an unexpected error counts as a failed request
+                if result is None:
+                    self.limiter.release(time.monotonic() - start)
+                else:
+                    self.limiter.release(time.monotonic() - start, result.status_code, result.retry_after)
+            with batch.lock:
+                self._handle_result(item, result, batch.committed)
+        except Exception as e:
+            logger.exception("Queue processing error: %s", e)
+        finally:
+            self._complete(batch, 1)
 
+    def _complete(self, batch: _Batch, count: int):
+        """Mark count readings of batch done; the last one commits it and finishes the queue entry"""
+        with batch.lock:
+            batch.remaining -= count
+            last = batch.remaining == 0
+        with self._in_flight_lock:
+            self._in_flight -= count
+        if last:
+            try:
+                self._commit(batch.committed)
+            finally:
                 self.pending_queue.task_done()
-            except queue.Empty:
-                continue
+                self._govern()
+
+    def _govern(self):
+        if self.memory is not None:
+            try:
+                self.memory.enforce(self)
             except Exception as e:
-                logger.exception(f"Queue processing error: {e}")
+                logger.error("Memory governor failed to spill: %s", e)
+
+    def _requeue(self, item: Dict) -> bool:
+        try:
+            self.pending_queue.put_nowait(item)
+        except queue.Full:
+            self.events.event("retry_dropped", logging.WARNING, "Queue full, dropping retry")
+            self._release_attachment(item)
+            return False
+        with self._in_flight_lock:
+            self._retrying += 1
+        if self._worker_thread is None:
+            self._ensure_worker()
+        return True
+
+    def _handle_result(self, item: Dict, result: TimestampResponse, committed: List[Dict]):
+        """Record a successful item in committed (see _commit) or schedule a retry"""
+        if item.get('retry_count') or item.get('throttle_count'):
+            with self._in_flight_lock:
+                self._retrying -= 1
+        if result.success:
+            item['timestamp'] = result.timestamp
+            item['proof'] = result.proof
+            committed.append(item)
+        elif (result.throttled and self.limiter is not None
+              and item.get('throttle_count', 0) < self.max_throttle_retries):
+            # the limiter has already backed off and will hold dispatch for Retry-After
+            self.events.event("throttled", logging.WARNING, "Throttled %s (HTTP %s)", item['id'],
+                              result.status_code)
+            item['throttle_count'] = item.get('throttle_count', 0) + 1
+            self._requeue(item)
+        else:
+            self.events.event("failed", logging.ERROR, "Failed %s: %s", item['id'], result.error)
+            if item.get('retry_count', 0) < 2:
+                item['retry_count'] = item.get('retry_count', 0) + 1
+                self._requeue(item)
+            else:
+                self._release_attachment(item)
+
+    def _commit(self, items: List[Dict]):
+        """Append timestamped items to the processed store under a single lock acquisition"""
+        if not items:
+            return
+        with self._lock:
+            self.processed_data.extend(items)
+            seq = len(self.processed_data)
+        for aggregate in list(self._aggregates.values()):
+            try:
+                aggregate.update(items)
+            except Exception as _e:
+                logger.debug("aggregate %s error: %s", aggregate.name, _e)
+        for listener in self._commit_listeners:
+            try:
+                listener(seq)
+            except Exception as _e:
+                logger.debug("commit listener error: %s", _e)
+        for item in items:
+            self.events.event("timestamped", logging.INFO, "Timestamped: %s", item['id'])
+            if callable(self.on_timestamped):
+                try:
+                    self.on_timestamped(item)
+                except Exception as _e:
+                    logger.debug("on_timestamped error: %s", _e)
+
+    def add_commit_listener(self, listener):
+        """Call listener(seq) after each commit, seq being the processed store's new length"""
+        self._commit_listeners.append(listener)
+
+    def remove_commit_listener(self, listener):
+        if listener in self._commit_listeners:
+            self._commit_listeners.remove(listener)
+
+    def register_aggregate(self, name: str, **kwargs) -> Aggregate:
+        """Maintain an Aggregate (see aggregates.Aggregate for kwargs) over records committed from now on"""
+        aggregate = Aggregate(name, **kwargs)
+        self._aggregates[name] = aggregate
+        return aggregate
+
+    def get_aggregate(self, name: str, group: Any = None) -> Optional[Dict[str, Any]]:
+        return self._aggregates[name].get(group)
+
+    def register_schema(self, schema: SensorSchema):
+        """Use a precompiled canonical encoder for readings of schema.sensor_type"""
+        self._encoders[schema.sensor_type] = schema.compile()
 
-    def add_sensor_reading(self, sensor_type: str, value: Any, metadata: Dict = None) -> str:
-        """Add sensor reading with SHA3-256 hashing"""
-        reading_id = f"{sensor_type}_{int(time.time() * 1000)}"
+    def add_sensor_reading(self, sensor_type: str, value: Any, metadata: Dict = None,
+                           max_metadata_size: Optional[int] = None, attachment: Optional[Buffer] = None) -> str:
+        """Add sensor reading with SHA3-256 hashing.
+
+        attachment: raw bytes stored beside the record; the envelope carries
+        only their length and SHA3-256 digest.
+        """
+        millis = int(time.time() * 1000)
+        reading_id = f"{sensor_type}_{millis}"
         data_dict = {
             "id": reading_id,
             "sensor_type": sensor_type,
@@ -155,8 +509,19 @@ class WearableDataProcessor:
             "timestamp_request": datetime.utcnow().isoformat(),
             "metadata": metadata or {}
         }
+        view = None
+        if attachment is not None:
+            view, data_dict["attachment"] = describe_attachment(attachment)
 
-        data_str = ensure_json_compact(data_dict)
+        data_str = None
+        encoder = self._encoders.get(sensor_type)
+        if encoder is not None:
+            data_str = encoder.encode(millis, data_dict["timestamp_request"], value, metadata, max_metadata_size,
+                                      data_dict.get("attachment"))
+        if data_str is None:
+            if max_metadata_size is not None and metadata and len(json.dumps(metadata)) > max_metadata_size:
+                raise ValueError(f"Metadata too large (>{max_metadata_size} bytes)")
+            data_str = ensure_json_compact(data_dict)
         data_hash = sha3_256(data_str.encode('utf-8')).hexdigest()
 
         queue_item = {
@@ -164,66 +529,299 @@ class WearableDataProcessor:
             "hash": data_hash,
             "original_data": data_dict
         }
+        if view is not None:
+            self.attachments.put(view, data_dict["attachment"]["sha3_256"])
+        if self.memory is not None and self.memory.exhausted and not self.memory.enforce(self):
+            self.memory.refused()
+            self._overflow([queue_item])
+            raise RuntimeError("Memory budget exceeded - data dropped")
+
+        if self.staging_batch_size:
+            self._stage(queue_item)
+            return reading_id
 
         try:
             self.pending_queue.put_nowait(queue_item)
         except queue.Full:
-            logger.error("Queue full, dropping sensor reading")
+            self._overflow([queue_item])
+            raise RuntimeError("Timestamp queue full - data dropped")
+
+        if self._worker_thread is None:  # worker exited after idling; start it on demand
+            self._ensure_worker()
+        return reading_id
+
+    def _release_attachment(self, item: Dict):
+        """Drop the attachment of a reading that will never be committed"""
+        attachment = item["original_data"].get("attachment")
+        if attachment is not None:
+            self.attachments.discard(attachment["sha3_256"])
+
+    def get_attachment(self, record: Dict) -> Optional[bytes]:
+        """Attachment bytes of a record, or None if it has none (or they are no longer stored)"""
+        attachment = record.get("original_data", {}).get("attachment")
+        return None if attachment is None else self.attachments.get(attachment["sha3_256"])
+
+    def _overflow(self, items: List[Dict]):
+        for item in items:
+            self._release_attachment(item)
+            self.events.event("dropped", logging.ERROR, "Queue full, dropping sensor reading")
             if callable(self.on_queue_overflow):
                 try:
-                    self.on_queue_overflow(queue_item)
+                    self.on_queue_overflow(item)
                 except Exception as _e:
-                    logger.debug(f"on_queue_overflow error: {_e}")
+                    logger.debug("on_queue_overflow error: %s", _e)
+
+    def _stage(self, item: Dict):
+        """Buffer item in the calling thread's staging buffer, handing off full or aged batches"""
+        buf = getattr(self._staging, "buffer", None)
+        if buf is None:
+            buf = self._staging.buffer = _StagingBuffer()
+            with self._lifecycle_lock:
+                self._staging_buffers.append(buf)
+        now = time.monotonic()
+        batch = None
+        with buf.lock:
+            full = len(buf.items) >= self.staging_batch_size * self.staging_buffer_batches
+            was_empty = not buf.items
+            if not full:
+                if was_empty:
+                    buf.first_at = now
+                buf.items.append(item)
+                if len(buf.items) >= self.staging_batch_size or now - buf.first_at >= self.staging_max_delay:
+                    batch, buf.items = buf.items, []
+        if full:
+            self._overflow([item])
             raise RuntimeError("Timestamp queue full - data dropped")
+        if batch is not None:
+            self._hand_off(buf, batch)
+        elif was_empty and (self._worker_waiting or self._worker_thread is None):
+            # an idle worker is blocked without a timeout; wake it so this reading is not stranded
+            try:
+                self.pending_queue.put_nowait(_WAKE)
+            except queue.Full:
+                pass
+            if self._worker_thread is None:
+                self._ensure_worker()
 
-        return reading_id
+    def _hand_off(self, buf: _StagingBuffer, batch: List[Dict]) -> bool:
+        try:
+            self.pending_queue.put_nowait(batch)
+        except queue.Full:
+            # Keep the readings staged (they were already accepted) and retry on the
+            # next reading or sweep; the buffer's cap turns sustained overload into drops.
+            with buf.lock:
+                buf.items[:0] = batch
+                buf.first_at = 0.0
+            return False
+        if self._worker_thread is None:
+            self._ensure_worker()
+        return True
+
+    def _has_staged(self) -> bool:
+        return any(buf.items for buf in self._staging_buffers)
+
+    def _sweep_staging(self, force: bool) -> bool:
+        """Hand off other threads' staged readings (only aged ones unless force); True if any moved"""
+        now = time.monotonic()
+        self._next_sweep = now + self.staging_max_delay
+        moved = False
+        for buf in list(self._staging_buffers):
+            if not buf.items and not buf.owner.is_alive():
+                with self._lifecycle_lock:
+                    self._staging_buffers.remove(buf)
+                continue
+            if not buf.items or (not force and now - buf.first_at < self.staging_max_delay):
+                continue
+            with buf.lock:
+                batch, buf.items = buf.items, []
+            if batch:
+                moved = self._hand_off(buf, batch) or moved
+        return moved
+
+    def flush_staged(self) -> int:
+        """Hand off every thread's staged readings now; returns how many were handed off"""
+        if not self.staging_batch_size:
+            return 0
+        staged = self._staged_count()
+        self._sweep_staging(force=True)
+        return staged
+
+    def _staged_count(self) -> int:
+        return sum(len(buf.items) for buf in self._staging_buffers)
 
     def get_processed_data(self) -> List[Dict]:
-        """Thread-safe access to processed data"""
+        """Thread-safe access to processed data (as one list: spilled records are all loaded back)"""
         with self._lock:
             return self.processed_data.copy()
 
+    def iter_processed_data(self, start: int = 0) -> Iterator[Dict]:
+        """Processed records from position start, read a segment at a time so spilled ones stay on disk"""
+        for page in self.processed_data.iter_pages(start):
+            yield from page
+
+    def get_processed_since(self, seq: int, limit: Optional[int] = None) -> List[Dict]:
+        """Processed records from position seq onwards (at most limit of them)"""
+        with self._lock:
+            end = len(self.processed_data) if limit is None else seq + limit
+            return self.processed_data[seq:end]
+
+    def processed_seq(self) -> int:
+        """Current length of the processed store, i.e. the seq the next record will get"""
+        with self._lock:
+            return len(self.processed_data)
+
+    def get_memory_usage(self) -> Optional[Dict[str, Any]]:
+        """Estimated bytes per component and spill counters, or None without a memory budget"""
+        return None if self.memory is None else self.memory.snapshot(self)
+
+    def is_running(self) -> bool:
+        worker = self._worker_thread
+        return worker is not None and worker.is_alive()
+
     def get_pending_count(self) -> int:
-        """Get current queue size"""
-        return self.pending_queue.qsize()
+        """Get number of readings waiting in the queue (and staging buffers)"""
+        if not self.staging_batch_size:
+            return self.pending_queue.qsize()
+        with self.pending_queue.mutex:
+            queued = sum(len(e) if isinstance(e, list) else 1 for e in self.pending_queue.queue
+                         if e is not None and e is not _WAKE)
+        return queued + self._staged_count()
 
 class WearablesSDK:
     """Main SDK interface optimized for wearable platforms"""
-    def __init__(self, api_key: str, cert_fingerprints: Optional[List[str]] = None, on_queue_overflow=None):
+    def __init__(self, api_key: str, cert_fingerprints: Optional[List[str]] = None, on_queue_overflow=None,
+                 base_url: str = DEFAULT_BASE_URL, on_timestamped=None, event_log: Optional[EventLog] = None,
+                 transport=None, idle_timeout: Optional[float] = None,
+                 limiter: Optional[AdaptiveConcurrencyLimiter] = None, staging_batch_size: Optional[int] = None,
+                 attachment_store: Optional[AttachmentStore] = None, memory_budget: Optional[int] = None,
+                 spill_dir: Optional[str] = None):
         if not api_key:
             raise ValueError("API key is required")
 
-        self.integritas_client = IntegritasClient(api_key, cert_fingerprints=cert_fingerprints)
-        self.data_processor = WearableDataProcessor(self.integritas_client, on_queue_overflow=on_queue_overflow)
+        self.integritas_client = IntegritasClient(api_key, base_url=base_url, cert_fingerprints=cert_fingerprints,
+                                                  event_log=event_log, transport=transport)
+        self.data_processor = WearableDataProcessor(self.integritas_client, on_queue_overflow=on_queue_overflow,
+                                                    on_timestamped=on_timestamped, idle_timeout=idle_timeout,
+                                                    limiter=limiter, staging_batch_size=staging_batch_size,
+                                                    attachment_store=attachment_store,
+                                                    memory_budget=memory_budget, spill_dir=spill_dir)
+        self.replicators: List[DeltaReplicator] = []
         self.data_processor.start_background_processing()
 
-    def record_sensor_data(self, sensor_type: str, value: Any, metadata: Dict = None) -> str:
-        if metadata and len(json.dumps(metadata)) > 1024:
-            raise ValueError("Metadata too large (>1KB)")
-        return self.data_processor.add_sensor_reading(sensor_type, value, metadata)
+    def register_sensor_type(self, sensor_type: str, value: Any = object,
+                             metadata: Optional[Dict[str, Any]] = None) -> SensorSchema:
+        """Declare a sensor type's value and metadata shape so its readings use a precompiled encoder.
+
+        e.g. sdk.register_sensor_type("heart_rate", int, {"unit": str})
+        """
+        schema = SensorSchema(sensor_type, value, metadata)
+        self.data_processor.register_schema(schema)
+        return schema
+
+    def enable_sync(self, base_url: str, state_dir: str, **kwargs) -> DeltaReplicator:
+        """Start replicating verified records to a collector at base_url.
+
+        Only records past the destination's persisted high-water mark are sent;
+        kwargs are passed to DeltaReplicator (name, path, headers, batch_size, ...).
+        """
+        replicator = DeltaReplicator(self.data_processor, base_url, state_dir, **kwargs).start()
+        self.replicators.append(replicator)
+        return replicator
+
+    def record_sensor_data(self, sensor_type: str, value: Any, metadata: Dict = None,
+                           attachment: Optional[Buffer] = None) -> str:
+        """Record a reading; attachment takes raw bytes, bytearray or memoryview data (e.g. a PPG frame)"""
+        return self.data_processor.add_sensor_reading(sensor_type, value, metadata,
+                                                      max_metadata_size=MAX_METADATA_SIZE, attachment=attachment)
+
+    def get_attachment(self, data_record: Dict) -> Optional[bytes]:
+        return self.data_processor.get_attachment(data_record)
+
+    def register_aggregate(self, name: str, sensor_type: Optional[str] = None, group_by: Optional[str] = None,
+                           **kwargs) -> Aggregate:
+        """Keep rolling statistics over verified records, updated as each one is timestamped.
+
+        e.g. sdk.register_aggregate("hr_1m", sensor_type="heart_rate", group_by="worker_id",
+        window=60, sliding=True, ewma_alpha=0.2); then sdk.get_aggregate("hr_1m", "W-1")
+        """
+        return self.data_processor.register_aggregate(name, sensor_type=sensor_type, group_by=group_by, **kwargs)
+
+    def get_aggregate(self, name: str, group: Any = None) -> Optional[Dict[str, Any]]:
+        """count / sum / min / max / mean (and ewma) for one group, or None before its first record"""
+        return self.data_processor.get_aggregate(name, group)
 
     def get_verified_data(self) -> List[Dict]:
+        """All verified records as a list; with a memory budget, prefer iter_verified_data"""
         return self.data_processor.get_processed_data()
 
-    def verify_timestamp(self, data_record: Dict) -> bool:
+    def iter_verified_data(self, start: int = 0) -> Iterator[Dict]:
+        """Verified records from position start, without loading every spilled segment at once"""
+        return self.data_processor.iter_processed_data(start)
+
+    def create_proof_verifier(self, anchor_path: Optional[str] = None, **kwargs) -> ProofVerifier:
+        """Offline proof verifier backed by an anchor store persisted at anchor_path.
+
+        The store is refreshed in bulk from the API now and when unknown anchors
+        appear; kwargs are passed to ProofVerifier.
+        """
+        store = AnchorStore(anchor_path, client=self.integritas_client)
+        try:
+            store.refresh()
+        except Exception as e:
+            logger.warning("Anchor refresh failed, using cached anchors: %s", e)
+        return ProofVerifier(store, **kwargs)
+
+    def verify_timestamp(self, data_record: Dict, verifier: Optional[ProofVerifier] = None) -> bool:
+        """Check the record's hash; with a verifier, also check its proof against known anchors.
+
+        With a verifier, a proof not in the assumed Merkle format raises
+        ``proofs.UnsupportedProofFormat`` instead of returning False.
+        """
         if not data_record.get('proof'):
             return False
 
         original = data_record['original_data']
         data_str = ensure_json_compact(original)
         recalculated_hash = sha3_256(data_str.encode('utf-8')).hexdigest()
-        return recalculated_hash == data_record['hash']
+        if recalculated_hash != data_record['hash']:
+            return False
+        attachment = original.get('attachment')
+        if attachment is not None:
+            # the digest is covered by the hash above; check the stored bytes still match it
+            data = self.data_processor.get_attachment(data_record)
+            if data is not None and sha3_256(data).hexdigest() != attachment['sha3_256']:
+                return False
+        return verifier is None or verifier.verify(data_record)
 
     def get_status(self) -> Dict[str, Any]:
-        return {
+        status = {
             "pending_requests": self.data_processor.get_pending_count(),
             "processed_count": len(self.data_processor.processed_data),
             "platform": sys.platform,
-            "queue_full": self.data_processor.pending_queue.full()
+            "queue_full": self.data_processor.pending_queue.full(),
+            "worker_running": self.data_processor.is_running()
         }
+        if self.data_processor.limiter is not None:
+            status["concurrency"] = self.data_processor.limiter.snapshot()
+        if self.data_processor.memory is not None:
+            status["memory"] = self.data_processor.get_memory_usage()
+        if self.replicators:
+            status["sync"] = [r.status() for r in self.replicators]
+        return status
+
+    def shutdown(self, drain_timeout: Optional[float] = None) -> int:
+        """Stop the worker, first waiting up to drain_timeout seconds for queued readings.
 
-    def shutdown(self):
-        self.data_processor.stop_background_processing()
+        Returns the number of readings left pending.
+        """
+        left = self.data_processor.stop_background_processing(drain_timeout=drain_timeout)
+        for replicator in getattr(self, "replicators", ()):
+            if drain_timeout:
+                replicator.sync_now(drain_timeout)
+            replicator.stop()
+        self.data_processor.events.flush()
+        self.integritas_client.close()
+        return left
 
     def __del__(self):
         try:
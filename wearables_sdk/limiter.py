@@ -0,0 +1,141 @@
+# wearables_sdk/limiter.py
+"""AIMD adaptive concurrency limiting for Integritas requests.
+
+The limit on in-flight requests grows additively (about +1 per limit's worth of
+healthy responses) while latency stays near the best observed, shrinks
+multiplicatively on throttling (429/503) or transport failures, and all
+dispatch pauses until any ``Retry-After`` deadline has passed.
+"""
+import math
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Optional
+
+THROTTLE_STATUSES = (429, 503)
+
+# Longest Retry-After honoured by default; a bogus header must not stall dispatch indefinitely
+MAX_RETRY_AFTER = 300.0
+
+
+def parse_retry_after(value: Optional[str], max_seconds: float = MAX_RETRY_AFTER) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP-date) into seconds from now, at most max_seconds.
+
+    Non-finite values ("inf", "nan") are ignored like unparseable ones.
+    """
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError, IndexError, OverflowError):
+            return None
+    if not math.isfinite(seconds):
+        return None
+    return min(max(0.0, seconds), max_seconds)
+
+
+class AdaptiveConcurrencyLimiter:
+    """Thread-safe AIMD limiter.
+
+    initial_limit / min_limit / max_limit: bounds on concurrent requests
+    (initial_limit defaults to 2, kept within [min_limit, max_limit]).
+    backoff: multiplicative decrease factor on throttling.
+    latency_tolerance: latency above this multiple of the baseline (best recent
+    latency) counts as queueing and stops growth; latency_target, if given,
+    replaces the adaptive threshold with a fixed one in seconds.
+    max_retry_after: longest pause, in seconds, a single Retry-After can impose.
+    """
+
+    def __init__(self, initial_limit: Optional[int] = None, min_limit: int = 1, max_limit: int = 16,
+                 backoff: float = 0.5, latency_tolerance: float = 2.0, latency_target: Optional[float] = None,
+                 max_retry_after: float = MAX_RETRY_AFTER, clock: Callable[[], float] = time.monotonic):
+        if initial_limit is None:
+            initial_limit = max(min_limit, min(2, max_limit))
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError("Require 1 <= min_limit <= initial_limit <= max_limit")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.latency_target = latency_target
+        self.max_retry_after = max_retry_after
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._limit = float(initial_limit)
+        self._in_flight = 0
+        self._baseline = None
+        self._blocked_until = 0.0
+        self._hold_decrease_until = 0.0
+        self._stats = {"acquired": 0, "throttled": 0, "failed": 0, "decreases": 0}
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Wait for a free slot outside any Retry-After window; False on timeout"""
+        deadline = None if timeout is None else self._clock() + timeout
+        with self._cond:
+            while True:
+                now = self._clock()
+                wait = None
+                if now < self._blocked_until:
+                    wait = self._blocked_until - now
+                elif self._in_flight < int(self._limit):
+                    self._in_flight += 1
+                    self._stats["acquired"] += 1
+                    return True
+                if deadline is not None:
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        return False
+                    wait = remaining if wait is None else min(wait, remaining)
+                self._cond.wait(wait)
+
+    def release(self, latency: float, status: Optional[int] = None, retry_after: Optional[float] = None):
+        """Return a slot and adapt the limit.
+
+        status is the HTTP status, or None if the request failed before a
+        response arrived (connection error or timeout).
+        """
+        with self._cond:
+            self._in_flight -= 1
+            now = self._clock()
+            if status in THROTTLE_STATUSES or status is None:
+                self._stats["throttled" if status else "failed"] += 1
+                if retry_after and retry_after > 0:
+                    self._blocked_until = max(self._blocked_until, now + min(retry_after, self.max_retry_after))
+                self._decrease(now, latency)
+            elif status < 400:
+                self._on_success(now, latency)
+            self._cond.notify_all()
+
+    def _on_success(self, now: float, latency: float):
+        if self._baseline is None or latency < self._baseline:
+            self._baseline = latency
+        else:
+            self._baseline += (latency - self._baseline) * 0.01  # let the baseline follow the path slowly
+        threshold = self.latency_target or self._baseline * self.latency_tolerance
+        if latency > threshold:
+            self._limit = max(self.min_limit, self._limit - 1.0 / self._limit)
+        elif self._in_flight + 1 >= int(self._limit):
+            # only grow when the current limit is actually being used
+            self._limit = min(self.max_limit, self._limit + 1.0 / self._limit)
+
+    def _decrease(self, now: float, latency: float):
+        # One multiplicative cut per round trip: the responses to a burst of
+        # requests sent at the old limit should not each halve it again.
+        if now < self._hold_decrease_until:
+            return
+        self._limit = max(self.min_limit, self._limit * self.backoff)
+        self._hold_decrease_until = now + max(latency, self._baseline or 0.0)
+        self._stats["decreases"] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._cond:
+            return dict(self._stats, limit=int(self._limit), in_flight=self._in_flight,
+                        baseline_latency=self._baseline,
+                        retry_after_remaining=max(0.0, self._blocked_until - self._clock()))
@@ -0,0 +1,348 @@
+# wearables_sdk/loadtest.py
+"""End-to-end load harness: replay sensor traces against WearablesSDK.
+
+Traces are JSON Lines, one reading per line::
+
+    {"t": 0.25, "sensor_type": "heart_rate", "value": 72, "metadata": {"unit": "bpm"}}
+
+where ``t`` is the offset in seconds from the start of the trace. Synthetic
+traces shaped like the ``examples/`` apps can be generated on the fly or saved
+with ``--save-trace``. By default the SDK is pointed at a local
+``MockIntegritasServer`` running in a child process, so the server neither
+competes with the SDK for the GIL nor counts towards its memory growth; pass
+``--url`` to target another endpoint.
+
+Usage::
+
+    python -m wearables_sdk.loadtest --profile safety --rate 200 --duration 30 --speed 4
+    python -m wearables_sdk.loadtest --trace recorded.jsonl --speed 10 --rate-limit 500
+"""
+import argparse
+import functools
+import gc
+import json
+import logging
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import requests
+
+from .core import WearablesSDK
+from .limiter import AdaptiveConcurrencyLimiter
+from .transport import TRANSPORTS
+
+PROFILES = ("fitness", "health", "safety", "environmental", "mixed")
+
+
+def load_trace(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield trace events from a JSON Lines file, in file order"""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def save_trace(events: Iterable[Dict[str, Any]], path: str) -> int:
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for event in events:
+            f.write(json.dumps(event, separators=(',', ':')) + "\n")
+            count += 1
+    return count
+
+
+def _fitness_reading(rng, i):
+    if i % 2:
+        return "heart_rate_zone", rng.randint(95, 175), {"session_id": "workout_loadtest", "zone": "cardio"}
+    steps = 150 * (i + 1)
+    return "steps", steps, {"session_id": "workout_loadtest", "distance_km": round(steps * 0.000762, 2),
+                            "calories_burned": round(steps * 0.04572, 1)}
+
+
+def _health_reading(rng, i):
+    return "heart_rate", rng.randint(55, 110), {"unit": "bpm"}
+
+
+def _safety_reading(rng, i):
+    meta = {"worker_id": "W-001", "site_id": "SITE-A", "session_id": "safety_loadtest"}
+    kind = i % 3
+    if kind == 0:
+        return "worker_vitals", {"heart_rate": rng.randint(60, 140),
+                                 "body_temperature": round(rng.uniform(36.0, 38.5), 1)}, meta
+    if kind == 1:
+        return "environmental_hazards", {"carbon_monoxide_ppm": round(rng.uniform(0, 50), 1),
+                                         "noise_db": rng.randint(60, 110)}, meta
+    return "worker_location", {"x": round(rng.uniform(0, 100), 2), "y": round(rng.uniform(0, 100), 2),
+                               "z": round(rng.uniform(0, 10), 2)}, dict(meta, coordinate_system="facility_local")
+
+
+def _environmental_reading(rng, i):
+    meta = {"location": "lab", "device_id": "ENV-001"}
+    kind = i % 3
+    if kind == 0:
+        return "temperature", round(rng.uniform(18, 30), 1), dict(meta, unit="celsius")
+    if kind == 1:
+        return "humidity", round(rng.uniform(20, 80), 1), dict(meta, unit="percent")
+    return "air_quality", rng.randint(0, 500), dict(meta, unit="aqi", pm25=rng.randint(0, 150),
+                                                     pm10=rng.randint(0, 200))
+
+
+_GENERATORS = {
+    "fitness": _fitness_reading,
+    "health": _health_reading,
+    "safety": _safety_reading,
+    "environmental": _environmental_reading,
+}
+
+
+def synthetic_trace(profile: str = "mixed", duration: float = 10.0, rate: float = 50.0,
+                    seed: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """Generate ``rate`` readings per second for ``duration`` seconds of trace time"""
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown profile {profile!r}; choose from {', '.join(PROFILES)}")
+    rng = random.Random(seed)
+    names = sorted(_GENERATORS) if profile == "mixed" else [profile]
+    total = int(duration * rate)
+    for i in range(total):
+        sensor_type, value, metadata = _GENERATORS[names[i % len(names)]](rng, i // len(names))
+        yield {"t": round(i / rate, 6), "sensor_type": sensor_type, "value": value, "metadata": metadata}
+
+
+def _rss_bytes() -> Optional[int]:
+    """Current resident set size, where the platform exposes it cheaply"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss if sys.platform == "darwin" else rss * 1024
+    except (ImportError, AttributeError):
+        return None
+
+
+def _percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    k = (len(sorted_values) - 1) * pct / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def run_load_test(events: Iterable[Dict[str, Any]], base_url: str, api_key: str = "loadtest",
+                  speed: float = 1.0, settle: float = 10.0, sdk_factory=None) -> Dict[str, Any]:
+    """Replay ``events`` at ``speed``x against a fresh SDK and return a metrics report.
+
+    ``sdk_factory(base_url=..., on_timestamped=...)`` may be supplied to build a
+    differently configured SDK; it must wire ``on_timestamped`` through.
+    """
+    lock = threading.Lock()
+    submitted = defaultdict(deque)  # reading id -> submit times (ids can repeat within 1 ms)
+    early = defaultdict(deque)  # completions that raced ahead of the submit bookkeeping
+    latencies = []
+    last_done = [None]
+
+    def on_timestamped(item):
+        now = time.perf_counter()
+        with lock:
+            times = submitted.get(item["id"])
+            if times:
+                latencies.append(now - times.popleft())
+                if not times:
+                    del submitted[item["id"]]
+            else:
+                early[item["id"]].append(now)
+            last_done[0] = now
+
+    gc.collect()
+    rss_start = _rss_bytes()
+    factory = sdk_factory or WearablesSDK
+    sdk = factory(api_key, base_url=base_url, on_timestamped=on_timestamped)
+    counts = {"submitted": 0, "dropped": 0, "rejected": 0}
+    try:
+        start = time.perf_counter()
+        for event in events:
+            due = start + float(event.get("t", 0.0)) / speed
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            try:
+                t0 = time.perf_counter()
+                reading_id = sdk.record_sensor_data(event["sensor_type"], event.get("value"), event.get("metadata"))
+                with lock:
+                    if early.get(reading_id):
+                        latencies.append(early[reading_id].popleft() - t0)
+                    else:
+                        submitted[reading_id].append(t0)
+                counts["submitted"] += 1
+            except RuntimeError:
+                counts["dropped"] += 1
+            except ValueError:
+                counts["rejected"] += 1
+        replay_end = time.perf_counter()
+
+        sdk.data_processor.drain(settle)
+        rss_end = _rss_bytes()
+    finally:
+        sdk.shutdown()
+
+    with lock:
+        done = sorted(latencies)
+        failed = sum(len(v) for v in submitted.values())
+        finished_at = last_done[0] or replay_end
+    elapsed = max(finished_at, replay_end) - start
+    ms = lambda v: None if v is None else round(v * 1000.0, 3)
+    return {
+        "submitted": counts["submitted"],
+        "timestamped": len(done),
+        "dropped": counts["dropped"],
+        "rejected": counts["rejected"],
+        "failed": failed,
+        "replay_seconds": round(replay_end - start, 3),
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_per_s": round(len(done) / elapsed, 2) if elapsed > 0 else 0.0,
+        "latency_ms": {
+            "p50": ms(_percentile(done, 50)),
+            "p90": ms(_percentile(done, 90)),
+            "p99": ms(_percentile(done, 99)),
+            "max": ms(done[-1] if done else None),
+        },
+        "memory_growth_bytes": (rss_end - rss_start) if rss_start is not None and rss_end is not None else None,
+    }
+
+
+def _format_report(report: Dict[str, Any]) -> str:
+    lat = report["latency_ms"]
+    growth = report["memory_growth_bytes"]
+    lines = [
+        f"submitted     {report['submitted']}",
+        f"timestamped   {report['timestamped']}",
+        f"dropped       {report['dropped']} (queue full)",
+        f"rejected      {report['rejected']} (invalid reading)",
+        f"failed        {report['failed']} (retries exhausted or unfinished)",
+        f"elapsed       {report['elapsed_seconds']} s (replay {report['replay_seconds']} s)",
+        f"throughput    {report['throughput_per_s']} readings/s",
+        f"latency ms    p50={lat['p50']} p90={lat['p90']} p99={lat['p99']} max={lat['max']}",
+        f"memory growth {'n/a' if growth is None else f'{growth / 1024.0:.1f} KiB'}",
+    ]
+    if "concurrency" in report:
+        c = report["concurrency"]
+        lines.append(f"concurrency   limit={c['limit']} throttled={c['throttled']} decreases={c['decreases']}")
+    if "server" in report:
+        lines.append("server        " + " ".join(f"{k}={v}" for k, v in report["server"].items()))
+    return "\n".join(lines)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog="wearables-loadtest", description=__doc__.split("\n")[0])
+    src = p.add_argument_group("trace")
+    src.add_argument("--trace", help="JSON Lines trace to replay (default: synthetic)")
+    src.add_argument("--profile", choices=PROFILES, default="mixed", help="synthetic trace shape")
+    src.add_argument("--duration", type=float, default=10.0, help="synthetic trace length, seconds")
+    src.add_argument("--rate", type=float, default=50.0, help="synthetic readings per second")
+    src.add_argument("--seed", type=int, default=None)
+    src.add_argument("--save-trace", metavar="PATH", help="write the trace to PATH before replaying")
+    src.add_argument("--speed", type=float, default=1.0, help="replay speed multiplier (Nx)")
+    src.add_argument("--settle", type=float, default=10.0, help="seconds to wait for the queue to drain")
+
+    srv = p.add_argument_group("server")
+    srv.add_argument("--url", help="target base URL instead of the local mock server")
+    srv.add_argument("--api-key", default=os.environ.get("INTEGRITAS_API_KEY", "loadtest"))
+    srv.add_argument("--transport", choices=sorted(TRANSPORTS), default="requests", help="SDK HTTP transport")
+    srv.add_argument("--adaptive", type=int, metavar="MAX", default=None,
+                     help="use an AIMD concurrency limiter with at most MAX requests in flight")
+    srv.add_argument("--latency", type=float, default=0.005, help="mock latency, seconds")
+    srv.add_argument("--jitter", type=float, default=0.0, help="mock latency jitter, seconds")
+    srv.add_argument("--error-rate", type=float, default=0.0, help="mock HTTP 500 fraction")
+    srv.add_argument("--rate-limit", type=float, default=None, help="mock requests/s before 429")
+    srv.add_argument("--burst", type=int, default=None, help="mock token-bucket burst size")
+    srv.add_argument("--retry-after", type=float, default=None, help="mock Retry-After seconds")
+    srv.add_argument("--max-concurrency", type=int, default=None, help="mock in-flight requests before 503")
+
+    p.add_argument("--json", action="store_true", help="print the report as JSON")
+    p.add_argument("--log-level", default="CRITICAL", help="SDK log level during the run")
+    return p
+
+
+def spawn_mock_server(args: argparse.Namespace) -> Tuple[subprocess.Popen, str]:
+    """Start ``python -m wearables_sdk.mock_server`` configured from args; returns (process, base URL)"""
+    cmd = [sys.executable, "-m", "wearables_sdk.mock_server", "--latency", str(args.latency),
+           "--jitter", str(args.jitter), "--error-rate", str(args.error_rate)]
+    for flag, value in (("--rate-limit", args.rate_limit), ("--burst", args.burst),
+                        ("--retry-after", args.retry_after), ("--max-concurrency", args.max_concurrency),
+                        ("--seed", args.seed)):
+        if value is not None:
+            cmd += [flag, str(value)]
+    env = dict(os.environ)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [root, env.get("PYTHONPATH")]))
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, env=env, universal_newlines=True)
+    base_url = proc.stdout.readline().strip()
+    if not base_url:
+        proc.kill()
+        proc.wait()
+        raise RuntimeError(f"Mock server exited with status {proc.returncode}")
+    return proc, base_url
+
+
+def _mock_stats(base_url: str) -> Optional[Dict[str, int]]:
+    try:
+        response = requests.get(f"{base_url}/_mock/stats", timeout=5)
+        return response.json() if response.status_code == 200 else None
+    except (requests.RequestException, ValueError):
+        return None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    logging.getLogger("wearables_sdk").setLevel(getattr(logging, args.log_level.upper(), logging.CRITICAL))
+
+    if args.trace:
+        events = list(load_trace(args.trace))
+    else:
+        events = list(synthetic_trace(args.profile, args.duration, args.rate, args.seed))
+    if args.save_trace:
+        save_trace(events, args.save_trace)
+
+    server = None
+    if args.url:
+        base_url = args.url
+    else:
+        server, base_url = spawn_mock_server(args)
+    try:
+        limiter = AdaptiveConcurrencyLimiter(max_limit=args.adaptive) if args.adaptive else None
+        factory = functools.partial(WearablesSDK, transport=args.transport, limiter=limiter)
+        report = run_load_test(events, base_url, api_key=args.api_key, speed=args.speed, settle=args.settle,
+                               sdk_factory=factory)
+        if server is not None:
+            stats = _mock_stats(base_url)
+            if stats is not None:
+                report["server"] = stats
+        if limiter is not None:
+            report["concurrency"] = limiter.snapshot()
+    finally:
+        if server is not None:
+            server.terminate()
+            try:
+                server.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                server.kill()
+                server.wait()
+            server.stdout.close()
+
+    print(json.dumps(report, indent=2) if args.json else _format_report(report))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
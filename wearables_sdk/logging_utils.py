@@ -0,0 +1,137 @@
+# wearables_sdk/logging_utils.py
+"""Low-overhead logging for the timestamp hot path.
+
+``EventLog`` replaces one-line-per-reading logging with per-event sampling and
+rate-limited summaries ("1520 readings timestamped in last 10s").
+``enable_async_logging()`` moves handler I/O and message formatting off the
+calling thread onto a ``QueueListener``.
+"""
+import logging
+import logging.handlers
+import queue
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+# Human-readable labels used in summary lines; unknown event names are used as-is.
+EVENT_LABELS = {
+    "timestamped": "readings timestamped",
+    "failed": "timestamp failures",
+    "request_failed": "request errors",
+    "retry_dropped": "retries dropped",
+    "throttled": "requests throttled",
+    "dropped": "readings dropped (queue full)",
+}
+
+
+class EventLog:
+    """Sampled, summarising logger for high-frequency events.
+
+    sample_every maps event name -> N: log 1 of every N occurrences individually
+    (1, the default, logs all; 0 suppresses individual lines). summary_interval,
+    when set, emits one INFO summary of event counts at most that often. Summaries
+    are emitted from ``event()`` calls and ``flush()``, so no timer thread runs.
+    """
+
+    def __init__(self, logger: logging.Logger, sample_every: Optional[Dict[str, int]] = None,
+                 summary_interval: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        self.logger = logger
+        self.sample_every = dict(sample_every or {})
+        self.summary_interval = summary_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._totals = {}
+        self._window = {}
+        self._window_start = clock()
+
+    def event(self, name: str, level: int, msg: str, *args):
+        """Count an event and log it if it falls on the sampling stride; args are formatted lazily"""
+        summary = None
+        with self._lock:
+            total = self._totals.get(name, 0) + 1
+            self._totals[name] = total
+            self._window[name] = self._window.get(name, 0) + 1
+            if self.summary_interval is not None:
+                now = self._clock()
+                if now - self._window_start >= self.summary_interval:
+                    # taken in the same critical section, so only one caller emits per window
+                    summary = self._take_window(now)
+        every = self.sample_every.get(name, 1)
+        if every and (every == 1 or total % every == 1) and self.logger.isEnabledFor(level):
+            self.logger.log(level, msg, *args)
+        if summary is not None:
+            self._emit(*summary)
+
+    def flush(self):
+        """Emit the pending summary (if summarising and any events were counted) and start a new window"""
+        with self._lock:
+            window, elapsed = self._take_window(self._clock())
+        if self.summary_interval is not None:
+            self._emit(window, elapsed)
+
+    def _take_window(self, now: float):
+        """Swap out the current window; the caller must hold the lock"""
+        window, self._window = self._window, {}
+        elapsed, self._window_start = now - self._window_start, now
+        return window, elapsed
+
+    def _emit(self, window: Dict[str, int], elapsed: float):
+        if window and self.logger.isEnabledFor(logging.INFO):
+            parts = ", ".join(f"{count} {EVENT_LABELS.get(name, name)}" for name, count in sorted(window.items()))
+            self.logger.info("%s in last %.0fs", parts, elapsed)
+
+    def counts(self) -> Dict[str, int]:
+        """Lifetime event counts"""
+        with self._lock:
+            return dict(self._totals)
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves formatting to the listener thread.
+
+    The stock handler formats in ``prepare()``, on the producer's thread. Records
+    are passed through untouched instead; callers should log immutable args.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+_async_state = {}
+_async_lock = threading.Lock()
+
+
+def enable_async_logging(logger: Optional[logging.Logger] = None) -> logging.handlers.QueueListener:
+    """Route ``logger``'s handlers (default: root) through a background QueueListener.
+
+    The logging call only enqueues the record; formatting and handler I/O happen
+    on the listener thread. Idempotent per logger; undo with ``disable_async_logging``.
+    """
+    target = logger or logging.getLogger()
+    with _async_lock:
+        if target.name in _async_state:
+            return _async_state[target.name][0]
+        handlers = list(target.handlers)
+        records = queue.SimpleQueue()
+        listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+        queue_handler = _DeferredQueueHandler(records)
+        for h in handlers:
+            target.removeHandler(h)
+        target.addHandler(queue_handler)
+        listener.start()
+        _async_state[target.name] = (listener, queue_handler, handlers)
+        return listener
+
+
+def disable_async_logging(logger: Optional[logging.Logger] = None):
+    """Flush queued records and restore the original handlers"""
+    target = logger or logging.getLogger()
+    with _async_lock:
+        state = _async_state.pop(target.name, None)
+    if state is None:
+        return
+    listener, queue_handler, handlers = state
+    target.removeHandler(queue_handler)
+    for h in handlers:
+        target.addHandler(h)
+    listener.stop()
@@ -0,0 +1,330 @@
+# wearables_sdk/memory.py
+"""Byte-budgeted memory governance for long-running devices.
+
+``SpillableStore`` is the list-like processed store. Its oldest ("coldest")
+records can be spilled to gzip-compressed JSONL segments and are faulted back
+in, one segment at a time, when read. ``MemoryGovernor`` estimates the bytes
+held by pending readings (queue, staging and in-flight, including retries),
+the in-memory part of the processed store, faulted-in segments and in-memory
+attachments. When that total passes the budget, it spills verified records and
+then attachments. If the SDK is still over budget, new readings are refused
+like a full queue, rather than letting the process grow until it is killed.
+
+Spill directories are marked with their owner's pid. They are removed when
+their store is garbage collected, and a new store sweeps away those left by
+processes that have since died.
+"""
+import bisect
+import gzip
+import json
+import os
+import shutil
+import sys
+import threading
+import weakref
+from collections import OrderedDict, deque
+from typing import Any, Dict, Iterator, List, Optional
+
+from .security import ensure_json_compact
+
+
+OWNER_FILE = "owner.pid"
+
+
+def claim_spill_dir(path: str, owner: Any):
+    """Create path, mark it as this process's, and remove it once owner is garbage collected"""
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, OWNER_FILE), "w") as f:
+        f.write(str(os.getpid()))
+    weakref.finalize(owner, shutil.rmtree, path, True)
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid == os.getpid() or sys.platform == "win32":  # os.kill would terminate the process on Windows
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True  # exists, but belongs to another user
+    return True
+
+
+def sweep_spill_dir(spill_dir: str) -> int:
+    """Remove subdirectories of spill_dir claimed by processes that are no longer running; returns how many"""
+    removed = 0
+    try:
+        names = os.listdir(spill_dir)
+    except FileNotFoundError:
+        return 0
+    for name in names:
+        path = os.path.join(spill_dir, name)
+        try:
+            with open(os.path.join(path, OWNER_FILE), "r") as f:
+                pid = int(f.read().strip())
+        except (OSError, ValueError):
+            continue  # not a spill directory, or still being claimed
+        if not _pid_alive(pid):
+            shutil.rmtree(path, True)
+            removed += 1
+    return removed
+
+
+def estimate_size(obj: Any) -> int:
+    """Approximate bytes held by a JSON-like object (shared strings are counted each time)"""
+    size = sys.getsizeof(obj)
+    t = type(obj)
+    if t is dict:
+        for k, v in obj.items():
+            size += sys.getsizeof(k) + estimate_size(v)
+    elif t is list or t is tuple:
+        for v in obj:
+            size += estimate_size(v)
+    return size
+
+
+class SpillableStore:
+    """Append-only list-like record store whose oldest records can live on disk.
+
+    Records [0, spilled) are in segments of up to segment_records records under
+    spill_dir; the rest stay in memory. Reading a spilled record loads its
+    segment into a cache of cached_segments segments. Records read back from
+    disk are fresh JSON-decoded dicts. Segment files are deleted when the store
+    is garbage collected; segment directories left behind by crashed processes
+    are swept when a store is created on the same spill_dir. Byte sizes are
+    only estimated with track_sizes (which spilling by size needs); without it
+    ``hot_bytes`` stays 0.
+    """
+
+    def __init__(self, spill_dir: Optional[str] = None, store_id: str = "store", segment_records: int = 1000,
+                 cached_segments: int = 2, track_sizes: bool = True):
+        self.track_sizes = track_sizes
+        self.segment_records = segment_records
+        self.cached_segments = cached_segments
+        self._dir = os.path.join(spill_dir, f"records-{store_id}") if spill_dir is not None else None
+        if spill_dir is not None:
+            sweep_spill_dir(spill_dir)
+        self._lock = threading.RLock()
+        self._hot: List[Dict] = []
+        self._hot_sizes = deque()
+        self._hot_start = 0
+        self._starts: List[int] = []  # first seq of each segment
+        self._segments: List[tuple] = []  # (count, path)
+        self._cache = OrderedDict()  # segment index -> (records, bytes)
+        self.hot_bytes = 0
+        self.cache_bytes = 0
+        self._bytes_seen = 0
+        self._records_seen = 0
+
+    @property
+    def can_spill(self) -> bool:
+        return self._dir is not None
+
+    @property
+    def avg_record_bytes(self) -> int:
+        return self._bytes_seen // self._records_seen if self._records_seen else 0
+
+    @property
+    def spilled(self) -> int:
+        """Number of records held on disk"""
+        return self._hot_start
+
+    def __len__(self):
+        return self._hot_start + len(self._hot)
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def append(self, record: Dict):
+        self.extend([record])
+
+    def extend(self, records: List[Dict]):
+        if not self.track_sizes:
+            with self._lock:
+                self._hot.extend(records)
+            return
+        sizes = [estimate_size(r) for r in records]
+        with self._lock:
+            self._hot.extend(records)
+            self._hot_sizes.extend(sizes)
+            added = sum(sizes)
+            self.hot_bytes += added
+            self._bytes_seen += added
+            self._records_seen += len(sizes)
+
+    def __getitem__(self, key):
+        with self._lock:
+            if isinstance(key, slice):
+                start, stop, step = key.indices(len(self))
+                if step != 1:
+                    return [self[i] for i in range(start, stop, step)]
+                return self._range(start, stop)
+            n = len(self)
+            if key < 0:
+                key += n
+            if not 0 <= key < n:
+                raise IndexError("store index out of range")
+            if key >= self._hot_start:
+                return self._hot[key - self._hot_start]
+            i = bisect.bisect_right(self._starts, key) - 1
+            return self._segment(i)[key - self._starts[i]]
+
+    def _range(self, start: int, stop: int) -> List[Dict]:
+        out = []
+        seq = start
+        while seq < min(stop, self._hot_start):
+            i = bisect.bisect_right(self._starts, seq) - 1
+            offset = seq - self._starts[i]
+            records = self._segment(i)[offset:offset + stop - seq]
+            out.extend(records)
+            seq += len(records)
+        if stop > self._hot_start:
+            out.extend(self._hot[max(0, start - self._hot_start):stop - self._hot_start])
+        return out
+
+    def iter_pages(self, start: int = 0, stop: Optional[int] = None) -> Iterator[List[Dict]]:
+        """Yield records [start, stop) in pages of at most segment_records.
+
+        Only one page is held at a time and the lock is released between pages,
+        so the store can keep growing (and spilling); stop defaults to the
+        length at the first page.
+        """
+        seq = start
+        while True:
+            with self._lock:
+                if stop is None:
+                    stop = len(self)
+                end = min(stop, len(self))
+                if seq >= end:
+                    return
+                if seq < self._hot_start:
+                    i = bisect.bisect_right(self._starts, seq) - 1
+                    offset = seq - self._starts[i]
+                    page = self._segment(i)[offset:offset + end - seq]
+                else:
+                    page = self._hot[seq - self._hot_start:min(end, seq + self.segment_records) - self._hot_start]
+            seq += len(page)
+            yield page
+
+    def __iter__(self) -> Iterator[Dict]:
+        for page in self.iter_pages():
+            yield from page
+
+    def copy(self) -> List[Dict]:
+        """All records as a plain list.
+
+        This materialises the whole store, faulting every spilled segment back
+        into memory; use ``iter_pages`` or slices to stay within a memory budget.
+        """
+        return self[:]
+
+    def spill(self, target_bytes: int) -> int:
+        """Move the oldest in-memory records to disk until at most target_bytes remain; returns bytes freed"""
+        if self._dir is None:
+            return 0
+        freed = 0
+        with self._lock:
+            while self._hot and self.hot_bytes > target_bytes:
+                n = min(self.segment_records, len(self._hot))
+                chunk = self._hot[:n]
+                path = self._write_segment(len(self._segments), chunk)
+                self._starts.append(self._hot_start)
+                self._segments.append((n, path))
+                chunk_bytes = sum(self._hot_sizes.popleft() for _ in range(n)) if self.track_sizes else 0
+                del self._hot[:n]
+                self._hot_start += n
+                self.hot_bytes -= chunk_bytes
+                freed += chunk_bytes
+        return freed
+
+    def drop_cache(self) -> int:
+        """Forget faulted-in segments (they are still on disk); returns bytes freed"""
+        with self._lock:
+            freed, self.cache_bytes = self.cache_bytes, 0
+            self._cache.clear()
+        return freed
+
+    def _write_segment(self, index: int, records: List[Dict]) -> str:
+        if not os.path.isdir(self._dir):
+            claim_spill_dir(self._dir, self)
+        path = os.path.join(self._dir, f"{index:08d}.jsonl.gz")
+        data = "\n".join(ensure_json_compact(r) for r in records).encode("utf-8")
+        with open(f"{path}.tmp", "wb") as f:
+            f.write(gzip.compress(data, compresslevel=6, mtime=0))
+        os.replace(f"{path}.tmp", path)
+        return path
+
+    def _segment(self, i: int) -> List[Dict]:
+        cached = self._cache.get(i)
+        if cached is not None:
+            self._cache.move_to_end(i)
+            return cached[0]
+        _, path = self._segments[i]
+        with open(path, "rb") as f:
+            records = [json.loads(line) for line in gzip.decompress(f.read()).split(b"\n")]
+        size = sum(estimate_size(r) for r in records) if self.track_sizes else 0
+        self._cache[i] = (records, size)
+        self.cache_bytes += size
+        while len(self._cache) > self.cached_segments:
+            self.cache_bytes -= self._cache.popitem(last=False)[1][1]
+        return records
+
+
+class MemoryGovernor:
+    """Keeps a WearableDataProcessor's estimated footprint under budget_bytes.
+
+    ``enforce`` (run by the worker after each commit) spills down to
+    low_water * budget_bytes, verified records first, then attachments. While
+    the total stays over budget, ``exhausted`` is set and new readings are refused.
+    """
+
+    def __init__(self, budget_bytes: int, low_water: float = 0.8):
+        if budget_bytes <= 0:
+            raise ValueError("budget_bytes must be positive")
+        self.budget_bytes = budget_bytes
+        self.low_water = low_water
+        self.exhausted = False
+        self._lock = threading.Lock()
+        self._stats = {"spills": 0, "spilled_bytes": 0, "refusals": 0}
+
+    def usage(self, processor) -> Dict[str, int]:
+        """Estimated bytes per component, and their total"""
+        store = processor.processed_data
+        per_item = store.avg_record_bytes or 1024  # pending readings are costed like verified ones
+        usage = {
+            "pending": (processor.get_pending_count() + processor._in_flight) * per_item,
+            "retry": processor._retrying * per_item,  # already part of pending
+            "verified": store.hot_bytes,
+            "segment_cache": store.cache_bytes,
+            "attachments": processor.attachments.memory_bytes,
+        }
+        usage["total"] = usage["pending"] + usage["verified"] + usage["segment_cache"] + usage["attachments"]
+        return usage
+
+    def enforce(self, processor) -> bool:
+        """Spill until under the low-water mark if over budget; returns True if within budget"""
+        with self._lock:
+            usage = self.usage(processor)
+            if usage["total"] > self.budget_bytes:
+                excess = usage["total"] - int(self.budget_bytes * self.low_water)
+                store = processor.processed_data
+                freed = store.drop_cache()
+                freed += store.spill(max(0, store.hot_bytes - (excess - freed)))
+                if freed < excess:
+                    freed += processor.attachments.spill_memory(
+                        max(0, processor.attachments.memory_bytes - (excess - freed)))
+                self._stats["spills"] += 1
+                self._stats["spilled_bytes"] += freed
+                usage = self.usage(processor)
+            self.exhausted = usage["total"] > self.budget_bytes
+            return not self.exhausted
+
+    def refused(self):
+        with self._lock:
+            self._stats["refusals"] += 1
+
+    def snapshot(self, processor) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._stats, budget=self.budget_bytes, exhausted=self.exhausted,
+                        spilled_records=processor.processed_data.spilled, **self.usage(processor))
@@ -0,0 +1,293 @@
+# wearables_sdk/mock_server.py
+"""Local stand-in for the Integritas API, for load and integration testing.
+
+Serves ``POST /v1/timestamp`` with configurable latency, injected error rate and
+token-bucket rate limiting that answers ``429 Too Many Requests`` with a
+``Retry-After`` header, mirroring the throttling behaviour of the real service.
+Timestamps are anchored in Merkle trees: requests arriving within
+``anchor_interval`` of each other share an anchor, whose root is published on
+``GET /v1/anchors``. ``GET /_mock/stats`` returns the server's counters.
+
+Run standalone (it prints its base URL, then serves until interrupted)::
+
+    python -m wearables_sdk.mock_server --port 8080 --latency 0.01 --rate-limit 500
+"""
+import argparse
+import itertools
+import json
+import math
+import random
+import sys
+import threading
+import time
+import urllib.parse
+from collections import deque
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+from .proofs import format_proof, leaf_digest, merkle_proofs
+from .security import ensure_json_compact
+
+
+class _TimestampHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the production endpoint
+    server_version = "MockIntegritas/1.0"
+    disable_nagle_algorithm = True  # headers and body go out in separate writes
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        if self.path != "/v1/timestamp":
+            self._reply(404, {"error": "not found"})
+            return
+        status, payload, headers = self.server.mock._handle_timestamp(self.headers, body)
+        self._reply(status, payload, headers)
+
+    def do_GET(self):
+        url = urllib.parse.urlsplit(self.path)
+        if url.path == "/_mock/stats":
+            self._reply(200, self.server.mock.stats())
+            return
+        if url.path != "/v1/anchors":
+            self._reply(404, {"error": "not found"})
+            return
+        status, payload = self.server.mock._handle_anchors(self.headers, urllib.parse.parse_qs(url.query))
+        self._reply(status, payload)
+
+    def _reply(self, status: int, payload: Dict, headers: Optional[Dict[str, str]] = None):
+        data = ensure_json_compact(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass  # request logging would dominate load-test profiles
+
+
+class MockIntegritasServer:
+    """Threaded HTTP server emulating the Integritas timestamp endpoint.
+
+    latency / latency_jitter: seconds added to every response (uniform jitter).
+    error_rate: fraction of requests answered with HTTP 500.
+    rate_limit / burst: token bucket in requests per second; excess gets 429.
+    retry_after: value of the ``Retry-After`` header on 429 responses; when
+    None it is derived from the time until the next token is available.
+    max_concurrency: requests in flight beyond this get 503 (no Retry-After).
+    anchor_interval: seconds a Merkle block stays open; its requests wait for it
+    to be sealed and share one anchor (0 anchors every request on its own).
+    max_anchors: published anchors kept for ``GET /v1/anchors``; older ones are
+    pruned, as a long load test would otherwise grow the list without bound.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                 latency_jitter: float = 0.0, error_rate: float = 0.0, rate_limit: Optional[float] = None,
+                 burst: Optional[int] = None, retry_after: Optional[float] = None, seed: Optional[int] = None,
+                 max_concurrency: Optional[int] = None, anchor_interval: float = 0.0,
+                 max_anchors: int = 10000):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.burst = burst if burst is not None else max(1, int(rate_limit or 1))
+        self.retry_after = retry_after
+        self.max_concurrency = max_concurrency
+        self.anchor_interval = anchor_interval
+        self.max_anchors = max_anchors
+        self._anchors = deque()
+        self._anchors_pruned = 0  # anchors dropped from the front; ids and cursors stay absolute
+        self._block = None
+        self._anchor_cond = threading.Condition()
+        self._in_flight = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._last_refill = time.monotonic()
+        self._stats = {"requests": 0, "ok": 0, "errors": 0, "throttled": 0, "overloaded": 0, "rejected": 0}
+        self._httpd = None
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> "MockIntegritasServer":
+        """Bind and serve in a daemon thread; returns self for chaining"""
+        if self._httpd is None:
+            self._httpd = ThreadingHTTPServer((self.host, self.port), _TimestampHandler)
+            self._httpd.daemon_threads = True
+            self._httpd.mock = self
+            self.port = self._httpd.server_address[1]
+            self._thread = threading.Thread(target=self._httpd.serve_forever, name="MockIntegritas")
+            self._thread.daemon = True
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._thread.join(timeout=2.0)
+            self._httpd = None
+            self._thread = None
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
+
+    def anchors(self) -> List[Dict]:
+        with self._anchor_cond:
+            return list(self._anchors)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _take_token(self) -> Optional[float]:
+        """Consume a rate-limit token; return seconds to wait if none available"""
+        if not self.rate_limit:
+            return None
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate_limit)
+        self._last_refill = now
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return None
+        return (1.0 - self._tokens) / self.rate_limit
+
+    def _handle_timestamp(self, headers, body: bytes):
+        with self._lock:
+            self._stats["requests"] += 1
+            wait = self._take_token()
+            fail = self.error_rate > 0 and self._random.random() < self.error_rate
+            delay = self.latency + (self._random.uniform(0, self.latency_jitter) if self.latency_jitter else 0.0)
+            overloaded = self.max_concurrency is not None and self._in_flight >= self.max_concurrency
+            if not overloaded:
+                self._in_flight += 1
+        try:
+            return self._respond(headers, body, wait, fail, delay, overloaded)
+        finally:
+            if not overloaded:
+                with self._lock:
+                    self._in_flight -= 1
+
+    def _respond(self, headers, body, wait, fail, delay, overloaded):
+        if overloaded:
+            return self._count("overloaded", 503, {"error": "server busy"})
+
+        if not headers.get("Authorization", "").startswith("Bearer "):
+            return self._count("rejected", 401, {"error": "missing API key"})
+        if wait is not None:
+            retry_after = self.retry_after if self.retry_after is not None else wait
+            return self._count("throttled", 429, {"error": "rate limit exceeded"},
+                               {"Retry-After": str(max(1, math.ceil(retry_after)))})
+        try:
+            data_hash = json.loads(body.decode("utf-8"))["hash"]
+        except (ValueError, KeyError, TypeError):
+            return self._count("rejected", 400, {"error": "invalid request body"})
+
+        if delay > 0:
+            time.sleep(delay)
+        if fail:
+            return self._count("errors", 500, {"error": "injected failure"})
+
+        timestamp = datetime.utcnow().isoformat() + "Z"
+        anchor_id, path = self._anchor(leaf_digest(data_hash, timestamp))
+        proof = format_proof(anchor_id, path)
+        return self._count("ok", 200, {"timestamp": timestamp, "hash": data_hash, "proof": proof})
+
+    def _anchor(self, leaf: bytes) -> Tuple[str, List]:
+        """Add leaf to the open block and wait for it to be sealed; returns (anchor id, path)"""
+        with self._anchor_cond:
+            block = self._block
+            if block is None:
+                block = self._block = {"leaves": [], "deadline": time.monotonic() + self.anchor_interval,
+                                       "sealed": None}
+            index = len(block["leaves"])
+            block["leaves"].append(leaf)
+            while block["sealed"] is None:
+                remaining = block["deadline"] - time.monotonic()
+                if remaining <= 0:
+                    self._seal(block)
+                    break
+                self._anchor_cond.wait(remaining)
+            anchor_id, paths = block["sealed"]
+            return anchor_id, paths[index]
+
+    def _seal(self, block):
+        root, paths = merkle_proofs(block["leaves"])
+        anchor_id = str(self._anchors_pruned + len(self._anchors) + 1)
+        self._anchors.append({"id": anchor_id, "root": root.hex(), "size": len(block["leaves"]),
+                              "time": datetime.utcnow().isoformat() + "Z"})
+        if len(self._anchors) > self.max_anchors:
+            self._anchors.popleft()
+            self._anchors_pruned += 1
+        block["sealed"] = (anchor_id, paths)
+        self._block = None
+        self._anchor_cond.notify_all()
+
+    def _handle_anchors(self, headers, query):
+        if not headers.get("Authorization", "").startswith("Bearer "):
+            return 401, {"error": "missing API key"}
+        try:
+            since = int(query.get("since", ["0"])[0])
+            limit = min(1000, int(query.get("limit", ["1000"])[0]))
+        except ValueError:
+            return 400, {"error": "invalid cursor"}
+        with self._anchor_cond:
+            since = max(since, self._anchors_pruned)
+            start = since - self._anchors_pruned
+            page = list(itertools.islice(self._anchors, start, start + limit))
+        return 200, {"anchors": page, "next": str(since + len(page))}
+
+    def _count(self, key: str, status: int, payload: Dict, headers: Optional[Dict[str, str]] = None):
+        with self._lock:
+            self._stats[key] += 1
+        return status, payload, headers
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog="wearables-mock-server", description=__doc__.split("\n")[0])
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=0, help="0 picks a free port")
+    p.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    p.add_argument("--jitter", type=float, default=0.0, help="latency jitter, seconds")
+    p.add_argument("--error-rate", type=float, default=0.0, help="fraction answered with HTTP 500")
+    p.add_argument("--rate-limit", type=float, default=None, help="requests/s before 429")
+    p.add_argument("--burst", type=int, default=None, help="token-bucket burst size")
+    p.add_argument("--retry-after", type=float, default=None, help="Retry-After seconds on 429")
+    p.add_argument("--max-concurrency", type=int, default=None, help="in-flight requests before 503")
+    p.add_argument("--anchor-interval", type=float, default=0.0, help="seconds a Merkle block stays open")
+    p.add_argument("--max-anchors", type=int, default=10000, help="published anchors kept before pruning")
+    p.add_argument("--seed", type=int, default=None)
+    return p
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    server = MockIntegritasServer(host=args.host, port=args.port, latency=args.latency, latency_jitter=args.jitter,
+                                  error_rate=args.error_rate, rate_limit=args.rate_limit, burst=args.burst,
+                                  retry_after=args.retry_after, seed=args.seed,
+                                  max_concurrency=args.max_concurrency, anchor_interval=args.anchor_interval,
+                                  max_anchors=args.max_anchors)
+    server.start()
+    print(server.base_url, flush=True)  # the first line tells a parent process where to connect
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
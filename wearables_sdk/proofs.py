@@ -0,0 +1,270 @@
+# wearables_sdk/proofs.py
+"""Offline verification of Integritas Merkle inclusion proofs.
+
+A timestamp proof is compact JSON ``{"anchor": id, "path": [[side, hex], ...]}``:
+the record's leaf digest, folded with each sibling on the given side ("L" or
+"R"), must reproduce the root of the named anchor. ``AnchorStore`` keeps the
+anchors locally (persisted, fetched in bulk from ``GET /v1/anchors``) and
+``ProofVerifier`` checks proofs against it without per-record network traffic.
+Interior digests already proven under an anchor are memoized, so verifying many
+records of one anchor hashes each shared subtree once.
+
+The proof format and the anchors endpoint are assumed: they describe how this
+SDK expects Integritas to publish Merkle anchors, and only
+``MockIntegritasServer`` implements them so far. A proof in any other format
+raises ``UnsupportedProofFormat`` rather than failing verification, so it is
+not mistaken for a tampered record.
+"""
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from .security import ensure_json_compact
+from .sync import _write_atomic
+
+try:
+    from hashlib import sha3_256
+except ImportError:  # pragma: no cover - legacy interpreters
+    from sha3 import sha3_256
+
+logger = logging.getLogger(__name__)
+
+ANCHORS_PATH = "/v1/anchors"
+
+# Domain separation: a leaf digest can never collide with an interior node's
+_LEAF = b"\x00"
+_NODE = b"\x01"
+
+
+class UnsupportedProofFormat(ValueError):
+    """The proof is not in the (assumed) Merkle proof format, so it cannot be checked offline"""
+
+
+def leaf_digest(data_hash: str, timestamp: str) -> bytes:
+    return sha3_256(_LEAF + f"{data_hash}:{timestamp}".encode("utf-8")).digest()
+
+
+def node_digest(left: bytes, right: bytes) -> bytes:
+    return sha3_256(_NODE + left + right).digest()
+
+
+def merkle_proofs(leaves: List[bytes]) -> Tuple[bytes, List[List[List[str]]]]:
+    """Build a tree over leaves; returns (root, path for each leaf). An unpaired node is promoted as is."""
+    if not leaves:
+        raise ValueError("Cannot build a Merkle tree without leaves")
+    paths = [[] for _ in leaves]
+    members = [[i] for i in range(len(leaves))]  # leaf indices under each node of the current level
+    level = list(leaves)
+    while len(level) > 1:
+        next_level, next_members = [], []
+        for i in range(0, len(level) - 1, 2):
+            left, right = level[i], level[i + 1]
+            for leaf in members[i]:
+                paths[leaf].append(["R", right.hex()])
+            for leaf in members[i + 1]:
+                paths[leaf].append(["L", left.hex()])
+            next_level.append(node_digest(left, right))
+            next_members.append(members[i] + members[i + 1])
+        if len(level) % 2:
+            next_level.append(level[-1])
+            next_members.append(members[-1])
+        level, members = next_level, next_members
+    return level[0], paths
+
+
+def format_proof(anchor_id: str, path: List[List[str]]) -> str:
+    return ensure_json_compact({"anchor": anchor_id, "path": path})
+
+
+def parse_proof(proof: str) -> Tuple[str, List[Tuple[str, bytes]]]:
+    """Return (anchor id, [(side, sibling digest), ...]); raises UnsupportedProofFormat for anything else"""
+    try:
+        data = json.loads(proof)
+        path = [(side, bytes.fromhex(digest)) for side, digest in data["path"]]
+        anchor = data["anchor"]
+    except (TypeError, ValueError, KeyError):
+        raise UnsupportedProofFormat("Proof is not a Merkle inclusion proof") from None
+    if not isinstance(anchor, str) or any(side not in ("L", "R") or len(d) != 32 for side, d in path):
+        raise UnsupportedProofFormat("Proof is not a Merkle inclusion proof")
+    return anchor, path
+
+
+class AnchorStore:
+    """Local copy of published anchors (id -> root digest), optionally persisted to path.
+
+    ``refresh`` pulls anchors published since the last fetch through
+    ``IntegritasClient.fetch_anchors`` (``GET /v1/anchors``, an assumed
+    endpoint) and saves the store atomically, once per refresh.
+    """
+
+    def __init__(self, path: Optional[str] = None, client=None):
+        self.path = path
+        self.client = client
+        self._lock = threading.Lock()
+        self._roots: Dict[str, bytes] = {}
+        self._cursor = None
+        if path is not None:
+            self._load()
+
+    def __len__(self):
+        return len(self._roots)
+
+    def __contains__(self, anchor_id):
+        return anchor_id in self._roots
+
+    def root(self, anchor_id: str) -> Optional[bytes]:
+        return self._roots.get(anchor_id)
+
+    def add(self, anchors: List[Dict], cursor: Optional[str] = None, save: bool = True):
+        """Merge anchors ({"id", "root"} dicts) and, unless save is False, persist"""
+        with self._lock:
+            for anchor in anchors:
+                self._roots[str(anchor["id"])] = bytes.fromhex(anchor["root"])
+            if cursor is not None:
+                self._cursor = cursor
+            if save:
+                self._save()
+
+    def refresh(self) -> int:
+        """Fetch anchors published since the last refresh; returns how many were added"""
+        if self.client is None:
+            raise RuntimeError("AnchorStore has no client to fetch anchors with")
+        before, fetched = len(self._roots), False
+        cursor = self._cursor
+        try:
+            while True:
+                anchors, next_cursor = self.client.fetch_anchors(cursor)
+                if not anchors:
+                    break
+                self.add(anchors, next_cursor, save=False)
+                fetched = True
+                # a server that does not advance the cursor would hand back this page forever
+                if next_cursor is None or next_cursor == cursor:
+                    break
+                cursor = next_cursor
+        finally:
+            if fetched:  # keep the pages that did arrive
+                with self._lock:
+                    self._save()
+        return len(self._roots) - before
+
+    def _load(self):
+        try:
+            with open(self.path, "rb") as f:
+                data = json.loads(f.read().decode("utf-8"))
+        except FileNotFoundError:
+            return
+        except ValueError:
+            logger.error("Corrupt anchor store %s; starting empty", self.path)
+            return
+        self._roots = {k: bytes.fromhex(v) for k, v in data.get("anchors", {}).items()}
+        self._cursor = data.get("cursor")
+
+    def _save(self):
+        if self.path is None:
+            return
+        data = ensure_json_compact({"anchors": {k: v.hex() for k, v in self._roots.items()},
+                                    "cursor": self._cursor}).encode("utf-8")
+        _write_atomic(self.path, data)
+
+
+class ProofVerifier:
+    """Checks records' Merkle proofs against an AnchorStore.
+
+    Digests proven to lead to an anchor's root are memoized for the
+    max_anchors most recently used anchors, so a fold stops as soon as it meets
+    one. Only the memo_levels levels just below each root are memoized: a tree
+    has about one interior node per record, so this caps the memo at
+    2 ** memo_levels digests per anchor however many records it covers. An
+    unknown anchor triggers at most one store refresh per refresh_interval
+    seconds (when the store has a client); until then such records fail
+    verification. Proofs in another format are not counted as
+    failures: ``verify`` raises ``UnsupportedProofFormat`` for them.
+    """
+
+    def __init__(self, store: AnchorStore, max_anchors: int = 256, refresh_interval: float = 60.0,
+                 memo_levels: int = 10, clock=time.monotonic):
+        self.store = store
+        self.max_anchors = max_anchors
+        self.memo_levels = memo_levels
+        self.refresh_interval = refresh_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._proven = OrderedDict()  # anchor id -> set of digests known to lead to its root
+        self._last_refresh = None
+        self._stats = {"verified": 0, "failed": 0, "unsupported": 0, "memo_hits": 0, "refreshes": 0}
+
+    def verify(self, record: Dict) -> bool:
+        """True if record's proof places (hash, timestamp) under a known anchor.
+
+        Raises UnsupportedProofFormat if the proof cannot be checked offline.
+        """
+        try:
+            ok = self._verify(record)
+        except UnsupportedProofFormat:
+            with self._lock:
+                self._stats["unsupported"] += 1
+            raise
+        with self._lock:
+            self._stats["verified" if ok else "failed"] += 1
+        return ok
+
+    def _verify(self, record: Dict) -> bool:
+        proof, data_hash, timestamp = record.get("proof"), record.get("hash"), record.get("timestamp")
+        if not proof or not data_hash or not timestamp:
+            return False
+        anchor_id, path = parse_proof(proof)
+        root = self._root(anchor_id)
+        if root is None:
+            return False
+
+        with self._lock:
+            proven = self._proven.get(anchor_id)
+            if proven is None:
+                proven = self._proven[anchor_id] = {root}
+                if len(self._proven) > self.max_anchors:
+                    self._proven.popitem(last=False)
+            else:
+                self._proven.move_to_end(anchor_id)
+
+        digest = leaf_digest(data_hash, timestamp)
+        seen = []  # digests on the way up that lie within memo_levels of the root
+        memo_hit = False
+        for i, (side, sibling) in enumerate(path):
+            digest = node_digest(sibling, digest) if side == "L" else node_digest(digest, sibling)
+            if digest in proven:
+                memo_hit = i < len(path) - 1
+                break
+            if len(path) - 1 - i < self.memo_levels:  # lower levels hold about one digest per record
+                seen.append(digest)
+        if digest not in proven:
+            return False
+        with self._lock:
+            proven.update(seen)
+            if memo_hit:
+                self._stats["memo_hits"] += 1
+        return True
+
+    def _root(self, anchor_id: str) -> Optional[bytes]:
+        root = self.store.root(anchor_id)
+        if root is not None or self.store.client is None:
+            return root
+        with self._lock:
+            now = self._clock()
+            due = self._last_refresh is None or now - self._last_refresh >= self.refresh_interval
+            if due:
+                self._last_refresh = now
+                self._stats["refreshes"] += 1
+        if due:
+            try:
+                self.store.refresh()
+            except Exception as e:
+                logger.warning("Anchor refresh failed: %s", e)
+        return self.store.root(anchor_id)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
@@ -0,0 +1,183 @@
+# wearables_sdk/schema.py
+"""Sensor-type registry with precompiled canonical encoders.
+
+Registering a sensor type's value and metadata shape once lets the SDK emit the
+canonical reading envelope from a fixed, pre-sorted template instead of running
+``ensure_json_compact`` (and a second ``json.dumps`` for the metadata size
+check) on every reading. Output is byte-identical to ``ensure_json_compact``;
+any reading that does not match the declared shape returns ``None`` from
+``encode`` and takes the generic path instead.
+"""
+import json
+from json.encoder import encode_basestring_ascii
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .security import ensure_json_compact
+
+# Exact-type dispatch mirrors json's C encoder with ensure_ascii=True. Subclasses
+# (bool is an int, str enums, ...) are deliberately absent and take the generic path.
+_SCALAR_ENCODERS: Dict[type, Callable[[Any], str]] = {
+    str: encode_basestring_ascii,
+    int: int.__repr__,
+    float: float.__repr__,
+    bool: lambda v: "true" if v else "false",
+    type(None): lambda v: "null",
+}
+
+# float.__repr__ output that JSON forbids; the generic path raises its usual error
+_NON_FINITE = frozenset(("nan", "inf", "-inf"))
+
+_DECLARABLE = (str, int, float, bool, type(None), dict, list, object)
+
+
+def _check_type(name: str, t):
+    if t not in _DECLARABLE:
+        raise TypeError(f"Unsupported type for {name!r}: {t!r}; use str, int, float, bool, None, dict, list or object")
+
+
+def _encode_any(v, declared: type) -> Optional[str]:
+    """Encode v using the declared type's encoder when it matches exactly, else by dispatch"""
+    enc = _SCALAR_ENCODERS.get(declared) if type(v) is declared else _SCALAR_ENCODERS.get(type(v))
+    if enc is not None:
+        encoded = enc(v)
+        return None if encoded in _NON_FINITE else encoded
+    if type(v) in (dict, list):
+        return ensure_json_compact(v)
+    return None
+
+
+class SensorSchema:
+    """Declared shape of one sensor type's readings.
+
+    value: a type (str, int, float, bool, dict, list, or object for anything
+    JSON-serializable) or a dict of field name -> type for object values.
+    metadata: dict of metadata key -> type; readings must carry exactly these keys.
+    Declared types select a specialised encoder; a value of another type is still
+    encoded correctly, just without the shortcut.
+    """
+
+    def __init__(self, sensor_type: str, value: Any = object, metadata: Optional[Dict[str, Any]] = None):
+        self.sensor_type = sensor_type
+        self.value = value
+        self.metadata = dict(metadata or {})
+        if isinstance(value, dict):
+            for k, t in value.items():
+                _check_type(f"value.{k}", t)
+        else:
+            _check_type("value", value)
+        for k, t in self.metadata.items():
+            _check_type(f"metadata.{k}", t)
+
+    def compile(self) -> "CanonicalEncoder":
+        return CanonicalEncoder(self)
+
+
+class _ObjectTemplate:
+    """Encoder for a dict with a fixed key set, keys pre-escaped in sorted order.
+
+    When every field is declared as a scalar type, ``encode`` is a function
+    generated for this exact key set: one type guard per field and a single
+    string concatenation, with no per-field loop or dispatch.
+    """
+
+    def __init__(self, fields: Dict[str, Any]):
+        self.keys = frozenset(fields)
+        self.fields = [(("{" if i == 0 else ",") + encode_basestring_ascii(k) + ":", k, fields[k],
+                        _SCALAR_ENCODERS.get(fields[k])) for i, k in enumerate(sorted(fields))]
+        if self.fields and all(fast is not None for _, _, _, fast in self.fields):
+            self.encode = self._compile()
+
+    def _compile(self) -> Callable[[Any], Optional[Tuple[str, int]]]:
+        ns = {"KEYS": self.keys, "NF": _NON_FINITE, "slow": self._encode_generic}
+        guards, encodes, finite, concat = [], [], [], []
+        for i, (frag, name, declared, fast) in enumerate(self.fields):
+            ns[f"T{i}"], ns[f"E{i}"], ns[f"F{i}"] = declared, fast, frag
+            guards.append(f"type(v{i}) is not T{i}")
+            encodes.append(f"    v{i} = obj[{name!r}]")
+            if declared is float:
+                finite.append(f"e{i} in NF")
+            concat.append(f"F{i} + e{i}")
+        extra = 2 * len(self.fields) - 1
+        lines = ["def encode(obj):",
+                 "    if type(obj) is not dict or obj.keys() != KEYS:",
+                 "        return None"]
+        lines += encodes
+        lines += [f"    if {' or '.join(guards)}:", "        return slow(obj)"]
+        lines += [f"    e{i} = E{i}(v{i})" for i in range(len(self.fields))]
+        if finite:
+            lines += [f"    if {' or '.join(finite)}:", "        return None"]
+        lines += [f"    compact = {' + '.join(concat)} + '}}'", f"    return compact, len(compact) + {extra}"]
+        exec(compile("\n".join(lines), "<schema template>", "exec"), ns)
+        return ns["encode"]
+
+    def encode(self, obj) -> Optional[Tuple[str, int]]:
+        """Return (compact JSON, json.dumps length) or None if obj does not fit the template"""
+        if type(obj) is not dict or obj.keys() != self.keys:
+            return None
+        return self._encode_generic(obj)
+
+    def _encode_generic(self, obj) -> Optional[Tuple[str, int]]:
+        if not self.fields:
+            return "{}", 2
+        parts = []
+        extra = 2 * len(self.fields) - 1  # ", " and ": " in json.dumps' default separators
+        for frag, name, declared, fast in self.fields:
+            v = obj[name]
+            if fast is not None and type(v) is declared:
+                encoded = fast(v)
+                if encoded in _NON_FINITE:
+                    return None
+            else:
+                encoded = _encode_any(v, declared)
+                if encoded is None:
+                    return None
+                if type(v) in (dict, list):
+                    extra += len(json.dumps(v)) - len(encoded)
+            parts += (frag, encoded)
+        parts.append("}")
+        compact = "".join(parts)
+        return compact, len(compact) + extra
+
+
+class CanonicalEncoder:
+    """Precompiled envelope encoder for one registered sensor type"""
+
+    def __init__(self, schema: SensorSchema):
+        self.schema = schema
+        escaped_type = encode_basestring_ascii(schema.sensor_type)
+        # ids are f"{sensor_type}_{millis}": only the digits vary
+        self._id_prefix = '{"id":' + escaped_type[:-1] + "_"
+        self._metadata = _ObjectTemplate(schema.metadata)
+        self._middle = ',"sensor_type":' + escaped_type + ',"timestamp_request":"'
+        self._value_object = _ObjectTemplate(schema.value) if isinstance(schema.value, dict) else None
+
+    def encode(self, millis: int, timestamp_request: str, value: Any, metadata: Optional[Dict],
+               max_metadata_size: Optional[int] = None, attachment: Optional[Dict] = None) -> Optional[str]:
+        """Encode one reading envelope, or return None if it does not match the schema.
+
+        Raises ValueError if the metadata's ``json.dumps`` length exceeds
+        max_metadata_size (the same measure the generic path uses). attachment
+        is a ``describe_attachment`` descriptor; "attachment" sorts before "id".
+        """
+        meta = self._metadata.encode(metadata if metadata is not None else {})
+        if meta is None:
+            return None
+        meta_json, meta_len = meta
+        if max_metadata_size is not None and metadata and meta_len > max_metadata_size:
+            raise ValueError(f"Metadata too large (>{max_metadata_size} bytes)")
+
+        if self._value_object is not None:
+            encoded = self._value_object.encode(value)
+            value_json = encoded[0] if encoded is not None else None
+        else:
+            value_json = _encode_any(value, self.schema.value)
+        if value_json is None:
+            return None
+
+        # isoformat() output never needs escaping
+        prefix = self._id_prefix
+        if attachment is not None:
+            prefix = ('{"attachment":{"length":%d,"sha3_256":"%s"},' % (attachment["length"], attachment["sha3_256"])
+                      + prefix[1:])
+        return (prefix + str(millis) + '","metadata":' + meta_json + self._middle
+                + timestamp_request + '","value":' + value_json + "}")
@@ -0,0 +1,324 @@
+# wearables_sdk/sync.py
+"""Incremental delta replication of verified records to a collector endpoint.
+
+``DeltaReplicator`` keeps a per-destination high-water mark (``acked_seq``) on
+the processed store and pushes only records past it, as gzip-compressed JSON
+batches. Each batch gets a deterministic id, sent as ``Idempotency-Key``, so a
+batch retried after a timeout or a restart is recognisable as a duplicate. The
+in-flight batch is spooled to disk before it is sent and the high-water mark is
+persisted once the collector acknowledges it, so a restart resends at most that
+one batch. Replication is triggered by commits; an idle replicator does not wake.
+
+The high-water mark belongs to the processor's ``store_id``, which is new in
+every process, and the processed store lives in memory. Records committed but
+not yet spooled when a process dies are therefore lost, not resent: only the
+spooled batch survives a crash. Shut down with ``drain_timeout`` (which calls
+``sync_now``) to narrow that window.
+"""
+import glob
+import gzip
+import json
+import logging
+import os
+import re
+import threading
+import time
+import weakref
+from typing import Any, Dict, Optional
+
+from .limiter import parse_retry_after
+from .security import ensure_json_compact
+from .transport import Transport, make_transport
+
+try:
+    from hashlib import sha3_256
+except ImportError:  # pragma: no cover - legacy interpreters
+    from sha3 import sha3_256
+
+logger = logging.getLogger(__name__)
+
+SYNC_PATH = "/v1/records"
+
+# Statuses worth retrying; any other 4xx means the collector rejected the batch
+RETRY_STATUSES = (408, 425, 429, 500, 502, 503, 504)
+
+# State file path -> the replicator in this process that owns it
+_claims = weakref.WeakValueDictionary()
+_claims_lock = threading.Lock()
+
+
+def _write_atomic(path: str, data: bytes):
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class DeltaReplicator:
+    """Replicates a WearableDataProcessor's processed store to one HTTP destination.
+
+    base_url / path: where batches are POSTed. state_dir: directory for the
+    persisted high-water mark and the spooled in-flight batch; name keys those
+    files (default: derived from the destination URL). batch_size: records per
+    batch. linger: seconds to wait for a batch to fill after a commit before
+    sending a partial one. backoff / max_backoff: retry delays in seconds,
+    doubled per attempt; a Retry-After header takes precedence. A batch
+    rejected (non-retryable 4xx) is retried at max_backoff up to max_rejections
+    times, then moved to ``sync-<name>.deadletter-<batch id>.gz`` in state_dir
+    and skipped, so one bad batch cannot block replication; ``status()`` lists
+    the dead-letter files.
+
+    The default name depends only on the destination, so several processors
+    (e.g. one SDK per device on a gateway) that share a state_dir need distinct
+    names; a second running replicator on the same state files raises
+    RuntimeError rather than overwriting the first one's spool and mark.
+    """
+
+    def __init__(self, processor, base_url: str, state_dir: str, name: Optional[str] = None,
+                 path: str = SYNC_PATH, headers: Optional[Dict[str, str]] = None, transport=None,
+                 batch_size: int = 500, linger: float = 1.0, backoff: float = 0.5, max_backoff: float = 60.0,
+                 compresslevel: int = 6, timeout=(5, 30), max_rejections: int = 5):
+        self.processor = processor
+        self.path = path
+        self.batch_size = batch_size
+        self.linger = linger
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.compresslevel = compresslevel
+        self.timeout = timeout
+        self.max_rejections = max_rejections
+        self.name = name or sha3_256(f"{base_url.rstrip('/')}{path}".encode("utf-8")).hexdigest()[:16]
+        if not re.fullmatch(r"[\w.-]+", self.name):
+            raise ValueError(f"Invalid destination name {self.name!r}")
+        os.makedirs(state_dir, exist_ok=True)
+        self._state_path = os.path.abspath(os.path.join(state_dir, f"sync-{self.name}.json"))
+        self._spool_path = os.path.join(state_dir, f"sync-{self.name}.batch.gz")
+        self._dead_letter_pattern = os.path.join(state_dir, f"sync-{self.name}.deadletter-*.gz")
+        self._claim()
+        self.transport: Transport = make_transport(transport, base_url, dict(headers or {}))
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._flush_requested = False
+        self._acked = threading.Condition()
+        self._stats = {"batches_sent": 0, "records_sent": 0, "bytes_sent": 0, "raw_bytes": 0, "retries": 0,
+                       "dead_lettered": 0, "errors": 0}
+        self._last_error = None
+        self.acked_seq = 0
+        self._in_flight = None  # {"batch_id", "from_seq", "to_seq", "store_id"} while a batch is spooled
+        self._load_state()
+
+    def start(self) -> "DeltaReplicator":
+        if self._thread is None or not self._thread.is_alive():
+            self._claim()
+            self._stop.clear()
+            self.processor.add_commit_listener(self._on_commit)
+            self._wake.set()  # pick up anything committed (or spooled) before start
+            self._thread = threading.Thread(target=self._run, name=f"DeltaReplicator-{self.name}")
+            self._thread.daemon = True
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 2.0):
+        """Stop replicating; an unacknowledged batch stays spooled and is resent on the next start"""
+        self.processor.remove_commit_listener(self._on_commit)
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+        with self._acked:
+            self._acked.notify_all()
+        self.transport.close()
+        with _claims_lock:
+            if _claims.get(self._state_path) is self:
+                del _claims[self._state_path]
+
+    def _claim(self):
+        with _claims_lock:
+            holder = _claims.get(self._state_path)
+            if holder is not None and holder is not self:
+                raise RuntimeError(f"Sync state {self._state_path} is in use by another replicator; "
+                                   f"give each processor its own name or state_dir")
+            _claims[self._state_path] = self
+
+    def sync_now(self, timeout: Optional[float] = None) -> bool:
+        """Send everything committed so far, bypassing linger; True if the destination caught up in time"""
+        target = self.processor.processed_seq()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        self._flush_requested = True
+        self._wake.set()
+        with self._acked:
+            while self.acked_seq < target or self._in_flight is not None:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if self._thread is None or (remaining is not None and remaining <= 0):
+                    return False
+                self._acked.wait(remaining)
+        return True
+
+    def status(self) -> Dict[str, Any]:
+        store_seq = self.processor.processed_seq()
+        return dict(self._stats, destination=self.name, acked_seq=self.acked_seq, store_seq=store_seq,
+                    lag=max(0, store_seq - self.acked_seq), in_flight=self._in_flight,
+                    last_error=self._last_error, dead_letters=sorted(glob.glob(self._dead_letter_pattern)))
+
+    def _on_commit(self, seq: int):
+        self._wake.set()
+
+    def _load_state(self):
+        try:
+            with open(self._state_path, "rb") as f:
+                state = json.loads(f.read().decode("utf-8"))
+        except FileNotFoundError:
+            state = {}
+        except ValueError:
+            logger.error("Corrupt sync state %s; replicating from the start", self._state_path)
+            state = {}
+        self._in_flight = state.get("in_flight")
+        if self._in_flight is not None and not os.path.exists(self._spool_path):
+            self._in_flight = None
+        if self._in_flight is None and os.path.exists(self._spool_path):
+            os.remove(self._spool_path)  # spooled but never recorded; its records are re-batched
+        # The high-water mark only applies to the store it was taken on
+        if state.get("store_id") == self.processor.store_id:
+            self.acked_seq = state.get("acked_seq", 0)
+
+    def _save_state(self):
+        state = {"store_id": self.processor.store_id, "acked_seq": self.acked_seq, "in_flight": self._in_flight}
+        _write_atomic(self._state_path, ensure_json_compact(state).encode("utf-8"))
+
+    def _batch_id(self, store_id: str, from_seq: int, to_seq: int) -> str:
+        return sha3_256(f"{store_id}:{self.name}:{from_seq}:{to_seq}".encode("utf-8")).hexdigest()[:32]
+
+    def _run(self):
+        failures = 0
+        while not self._stop.is_set():
+            self._wake.wait()
+            self._wake.clear()
+            try:
+                self._replicate()
+                failures = 0
+            except Exception as e:
+                # e.g. a full disk while spooling: keep the thread alive and try again later
+                self._last_error = str(e)
+                self._stats["errors"] += 1
+                delay = min(self.max_backoff, self.backoff * 2 ** failures)
+                failures += 1
+                logger.error("Sync to %s failed (%s); retrying in %.1fs", self.name, e, delay)
+                self._stop.wait(delay)
+                self._wake.set()
+
+    def _replicate(self):
+        """Resend any spooled batch, then send batches until caught up or stopped"""
+        if self._in_flight is not None:
+            # a batch from before a restart (possibly from an earlier store) goes first
+            with open(self._spool_path, "rb") as f:
+                body = f.read()
+            accepted = self._deliver(self._in_flight["batch_id"], body)
+            if accepted is None:
+                return
+            if not accepted:
+                self._dead_letter()
+            self._acknowledge()
+        self._linger()
+        self._flush_requested = False
+        while not self._stop.is_set() and self._send_next():
+            pass
+
+    def _linger(self):
+        """Wait up to linger seconds for a partial batch to fill; commits and sync_now cut it short"""
+        deadline = time.monotonic() + self.linger
+        while not self._stop.is_set() and not self._flush_requested:
+            pending = self.processor.processed_seq() - self.acked_seq
+            remaining = deadline - time.monotonic()
+            if not 0 < pending < self.batch_size or remaining <= 0:
+                return
+            self._wake.wait(remaining)
+            self._wake.clear()
+
+    def _send_next(self) -> bool:
+        """Spool, send and acknowledge the next batch; False when there is nothing to send or on stop"""
+        records = self.processor.get_processed_since(self.acked_seq, self.batch_size)
+        if not records:
+            return False
+        store_id = self.processor.store_id
+        from_seq, to_seq = self.acked_seq, self.acked_seq + len(records)
+        batch_id = self._batch_id(store_id, from_seq, to_seq)
+        raw = ensure_json_compact({"store_id": store_id, "batch_id": batch_id, "from_seq": from_seq,
+                                   "to_seq": to_seq, "records": records}).encode("utf-8")
+        body = gzip.compress(raw, compresslevel=self.compresslevel, mtime=0)
+        self._stats["raw_bytes"] += len(raw)
+        # spool first: once the state names the batch, its bytes must be on disk
+        _write_atomic(self._spool_path, body)
+        self._in_flight = {"batch_id": batch_id, "store_id": store_id, "from_seq": from_seq, "to_seq": to_seq}
+        self._save_state()
+        accepted = self._deliver(batch_id, body)
+        if accepted is None:
+            return False
+        if accepted:
+            self._stats["records_sent"] += len(records)
+        else:
+            self._dead_letter()
+        self._acknowledge()
+        return True
+
+    def _acknowledge(self):
+        with self._acked:
+            if self._in_flight["store_id"] == self.processor.store_id:
+                self.acked_seq = self._in_flight["to_seq"]
+            self._in_flight = None
+            try:
+                # if this fails, the old mark stays on disk and a restart resends the (idempotent) batch
+                self._save_state()
+                try:
+                    os.remove(self._spool_path)
+                except FileNotFoundError:
+                    pass  # dead-lettered
+            finally:
+                self._acked.notify_all()
+
+    def _dead_letter(self):
+        """Move the spooled batch aside so replication can move past it"""
+        path = self._dead_letter_pattern.replace("*", self._in_flight["batch_id"])
+        os.replace(self._spool_path, path)
+        self._stats["dead_lettered"] += 1
+        logger.error("Sync batch %s (seq %d-%d) gave up after %d rejections; moved to %s",
+                     self._in_flight["batch_id"], self._in_flight["from_seq"], self._in_flight["to_seq"],
+                     self.max_rejections, path)
+
+    def _deliver(self, batch_id: str, body: bytes) -> Optional[bool]:
+        """POST a batch until the destination accepts it (True) or rejects it max_rejections times (False);
+        None if stopped first"""
+        headers = {"Content-Type": "application/json", "Content-Encoding": "gzip", "Idempotency-Key": batch_id}
+        attempt = rejections = 0
+        while not self._stop.is_set():
+            status, retry_after = None, None
+            try:
+                response = self.transport.request("POST", self.path, body, headers=headers, timeout=self.timeout)
+                status = response.status
+                # 409: the collector already has this batch id
+                if status < 300 or status == 409:
+                    self._stats["batches_sent"] += 1
+                    self._stats["bytes_sent"] += len(body)
+                    self._last_error = None
+                    return True
+                retry_after = parse_retry_after(response.headers.get("retry-after"), self.max_backoff)
+                self._last_error = f"HTTP {status} {response.reason}"
+            except Exception as e:
+                self._last_error = str(e)
+            delay = min(self.max_backoff, self.backoff * 2 ** attempt)
+            if status is not None and status not in RETRY_STATUSES:
+                logger.error("Sync batch %s rejected by %s: %s", batch_id, self.name, self._last_error)
+                rejections += 1
+                if rejections >= self.max_rejections:
+                    return False
+                delay = self.max_backoff
+            if retry_after is not None:
+                delay = retry_after
+            logger.warning("Sync batch %s failed (%s); retrying in %.1fs", batch_id, self._last_error, delay)
+            self._stats["retries"] += 1
+            attempt += 1
+            self._stop.wait(delay)
+        return None
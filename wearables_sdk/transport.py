@@ -0,0 +1,196 @@
+# wearables_sdk/transport.py
+"""Pluggable HTTP transports for IntegritasClient.
+
+``RequestsTransport`` (the default) wraps ``requests.Session``.
+``HttpClientTransport`` is a lean alternative on ``http.client`` for watch-class
+hardware: pooled keep-alive connections, headers serialized once at
+construction and the timestamp request body filled in from a byte template.
+"""
+import http.client
+import json
+import ssl
+import threading
+import urllib.parse
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple, Union
+
+from .security import ensure_json_compact
+
+Timeout = Union[float, Tuple[float, float]]
+
+TIMESTAMP_PATH = "/v1/timestamp"
+
+
+@dataclass
+class TransportResponse:
+    """Minimal HTTP response: status, reason, lower-cased headers and raw body"""
+    status: int
+    reason: str = ""
+    headers: Dict[str, str] = field(default_factory=dict)
+    body: bytes = b""
+
+    def json(self):
+        return json.loads(self.body.decode("utf-8"))
+
+
+class Transport:
+    """Base transport. Subclasses implement ``request``; ``post_timestamp`` may be specialised."""
+
+    def __init__(self, base_url: str, headers: Optional[Dict[str, str]] = None):
+        self.base_url = base_url.rstrip('/')
+        self.headers = dict(headers or {})
+
+    def request(self, method: str, path: str, body: Optional[bytes] = None,
+                headers: Optional[Dict[str, str]] = None, timeout: Timeout = (5, 10)) -> TransportResponse:
+        raise NotImplementedError
+
+    def post_timestamp(self, data_hash: str, timeout: Timeout = (5, 10)) -> TransportResponse:
+        body = ensure_json_compact({"hash": data_hash}).encode("utf-8")
+        return self.request("POST", TIMESTAMP_PATH, body, timeout=timeout)
+
+    def close(self):
+        pass
+
+
+class RequestsTransport(Transport):
+    """Transport backed by a ``requests.Session`` (honours proxies and env settings)"""
+
+    def __init__(self, base_url: str, headers: Optional[Dict[str, str]] = None):
+        super().__init__(base_url, headers)
+        import requests
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+
+    def request(self, method, path, body=None, headers=None, timeout=(5, 10)):
+        r = self.session.request(method, f"{self.base_url}{path}", data=body, headers=headers, timeout=timeout)
+        return TransportResponse(r.status_code, r.reason or "", {k.lower(): v for k, v in r.headers.items()},
+                                 r.content)
+
+    def close(self):
+        self.session.close()
+
+
+class HttpClientTransport(Transport):
+    """Lean keep-alive transport on ``http.client``.
+
+    Up to ``pool_size`` idle connections are kept for reuse (one per concurrent
+    caller). The timestamp request line and headers are pre-serialized, so a
+    timestamp call costs one byte concatenation and one ``sendall``. A request
+    on a reused connection that the server has since closed is retried once on a
+    fresh connection. Proxies are not supported.
+    """
+
+    def __init__(self, base_url: str, headers: Optional[Dict[str, str]] = None, pool_size: int = 4,
+                 ssl_context: Optional[ssl.SSLContext] = None):
+        super().__init__(base_url, headers)
+        parsed = urllib.parse.urlsplit(self.base_url)
+        if parsed.scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported URL scheme: {parsed.scheme!r}")
+        self._https = parsed.scheme == "https"
+        self._host = parsed.hostname
+        self._port = parsed.port or (443 if self._https else 80)
+        self._prefix = parsed.path.rstrip('/')
+        self._ssl_context = ssl_context or (ssl.create_default_context() if self._https else None)
+        self._pool_size = pool_size
+        self._pool = []
+        self._pool_lock = threading.Lock()
+
+        default_port = 443 if self._https else 80
+        host_header = self._host if self._port == default_port else f"{self._host}:{self._port}"
+        lines = [f"Host: {host_header}"] + [f"{k}: {v}" for k, v in self.headers.items()]
+        self._static_headers = ("\r\n".join(lines) + "\r\n").encode("latin-1")
+        self._timestamp_head = (f"POST {self._prefix}{TIMESTAMP_PATH} HTTP/1.1\r\n".encode("latin-1")
+                                + self._static_headers + b"Content-Length: ")
+
+    def post_timestamp(self, data_hash, timeout=(5, 10)):
+        # hex digests never need escaping; anything else (including non-ASCII) goes the slow way
+        if not (data_hash.isascii() and data_hash.isalnum()):
+            return super().post_timestamp(data_hash, timeout)
+        body = b'{"hash":"' + data_hash.encode("ascii") + b'"}'
+        return self._exchange(self._timestamp_head + b"%d\r\n\r\n" % len(body) + body, "POST", timeout)
+
+    def request(self, method, path, body=None, headers=None, timeout=(5, 10)):
+        head = f"{method} {self._prefix}{path} HTTP/1.1\r\n".encode("latin-1") + self._static_headers
+        if headers:
+            head += "".join(f"{k}: {v}\r\n" for k, v in headers.items()).encode("latin-1")
+        body = body or b""
+        if body or method in ("POST", "PUT", "PATCH"):
+            head += b"Content-Length: %d\r\n" % len(body)
+        return self._exchange(head + b"\r\n" + body, method, timeout)
+
+    def close(self):
+        with self._pool_lock:
+            conns, self._pool = self._pool, []
+        for conn in conns:
+            conn.close()
+
+    def _exchange(self, raw: bytes, method: str, timeout: Timeout) -> TransportResponse:
+        connect_timeout, read_timeout = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+        conn = self._acquire()
+        reused = conn.sock is not None
+        try:
+            if not reused:
+                conn.timeout = connect_timeout
+                conn.connect()
+            try:
+                response, will_close = self._roundtrip(conn, raw, method, read_timeout)
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                conn.close()
+                if not reused:
+                    raise
+                conn.timeout = connect_timeout
+                conn.connect()
+                response, will_close = self._roundtrip(conn, raw, method, read_timeout)
+        except BaseException:
+            conn.close()
+            raise
+
+        if will_close:
+            conn.close()
+        self._release(conn)
+        return response
+
+    @staticmethod
+    def _roundtrip(conn, raw, method, read_timeout):
+        conn.sock.settimeout(read_timeout)
+        conn.sock.sendall(raw)
+        resp = http.client.HTTPResponse(conn.sock, method=method)
+        resp.begin()
+        body = resp.read()
+        headers = {k.lower(): v for k, v in resp.getheaders()}
+        return TransportResponse(resp.status, resp.reason, headers, body), resp.will_close
+
+    def _acquire(self):
+        with self._pool_lock:
+            if self._pool:
+                return self._pool.pop()
+        if self._https:
+            return http.client.HTTPSConnection(self._host, self._port, context=self._ssl_context)
+        return http.client.HTTPConnection(self._host, self._port)
+
+    def _release(self, conn):
+        if conn.sock is None:
+            return
+        with self._pool_lock:
+            if len(self._pool) < self._pool_size:
+                self._pool.append(conn)
+                return
+        conn.close()
+
+
+TRANSPORTS = {
+    "requests": RequestsTransport,
+    "http.client": HttpClientTransport,
+}
+
+
+def make_transport(transport, base_url: str, headers: Dict[str, str]) -> Transport:
+    """Build a transport from a registered name or a ``(base_url, headers)`` factory/class"""
+    if transport is None:
+        transport = "requests"
+    if isinstance(transport, str):
+        try:
+            transport = TRANSPORTS[transport]
+        except KeyError:
+            raise ValueError(f"Unknown transport {transport!r}; choose from {', '.join(TRANSPORTS)}")
+    return transport(base_url, headers)